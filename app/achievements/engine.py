@@ -0,0 +1,94 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from sqlalchemy.dialects.postgresql import insert
+from app.database import row_batches
+from app.events import CommentPosted, DonationCompleted, ProjectCreated
+from app.models import Achievement, UserCounter
+
+COUNTERS = ("donations", "donated_total", "projects_backed", "projects_created", "comments")
+
+
+@dataclass(frozen=True)
+class Rule:
+    code: str
+    counter: str
+    threshold: int
+    title: str
+    description: str
+    icon: str
+
+
+RULES = (
+    Rule("first_donation", "donations", 1, "Первый вклад", "Сделайте первое пожертвование", "🌱"),
+    Rule("donations_10", "donations", 10, "Постоянный меценат", "Сделайте 10 пожертвований", "💚"),
+    Rule("donations_50", "donations", 50, "Опора сообщества", "Сделайте 50 пожертвований", "🌳"),
+    Rule("donated_10000", "donated_total", 10_000, "Щедрое сердце", "Пожертвуйте 10 000 ₽", "💎"),
+    Rule("donated_100000", "donated_total", 100_000, "Большой вклад", "Пожертвуйте 100 000 ₽", "🏆"),
+    Rule("backed_5", "projects_backed", 5, "Исследователь", "Поддержите 5 разных проектов", "🧭"),
+    Rule("first_project", "projects_created", 1, "Инициатор", "Создайте первый проект", "🚀"),
+    Rule("first_comment", "comments", 1, "Голос сообщества", "Оставьте первый комментарий", "💬"),
+    Rule("comments_25", "comments", 25, "Активный участник", "Оставьте 25 комментариев", "📣"),
+)
+
+RULES_BY_COUNTER: dict[str, list[Rule]] = defaultdict(list)
+for rule in RULES:
+    RULES_BY_COUNTER[rule.counter].append(rule)
+
+
+def event_deltas(event) -> dict:
+    if isinstance(event, DonationCompleted):
+        return {"donations": 1, "donated_total": event.amount, "projects_backed": int(event.new_backer)}
+    if isinstance(event, ProjectCreated):
+        return {"projects_created": 1}
+    if isinstance(event, CommentPosted):
+        return {"comments": 1}
+    raise TypeError(f"Unknown event {event!r}")
+
+
+def counters_statement(rows: list[dict]):
+    statement = insert(UserCounter).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[UserCounter.user_id],
+        set_={counter: getattr(UserCounter, counter) + getattr(statement.excluded, counter) for counter in COUNTERS}
+    ).returning(UserCounter.user_id, *(getattr(UserCounter, counter) for counter in COUNTERS))
+
+
+async def record(db, events) -> list[dict]:
+    """Applies events to the running counters and awards the rules they cross.
+
+    Runs inside the caller's transaction, so counters and achievements commit
+    or roll back together with the change that produced the events.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for event in events:
+        for counter, value in event_deltas(event).items():
+            deltas[event.user_id][counter] += value
+    if not deltas:
+        return []
+
+    rows = [{"user_id": user_id, **delta} for user_id, delta in sorted(deltas.items())]
+    counters = []
+    for batch in row_batches(UserCounter.__table__, rows):
+        counters.extend(await db.execute(counters_statement(batch)))
+
+    earned = []
+    for row in counters:
+        for counter, value in deltas[row.user_id].items():
+            if not value:
+                continue
+            current = getattr(row, counter)
+            previous = current - value
+            earned.extend(
+                {
+                    "user_id": row.user_id, "code": rule.code, "title": rule.title,
+                    "description": rule.description, "icon": rule.icon,
+                }
+                for rule in RULES_BY_COUNTER[counter]
+                if previous < rule.threshold <= current
+            )
+
+    for batch in row_batches(Achievement.__table__, earned):
+        await db.execute(
+            insert(Achievement).values(batch).on_conflict_do_nothing(constraint="uq_achievements_user_code")
+        )
+    return earned
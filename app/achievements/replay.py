@@ -0,0 +1,115 @@
+"""Achievement backfill: ``python -m app.achievements.replay``.
+
+Rebuilds ``user_counters`` from completed transactions, created projects and
+posted comments, then awards every rule the rebuilt counters have reached.
+Achievements that already exist are kept; the (user_id, code) constraint
+makes re-awarding a no-op.
+
+The counters are aggregated set-based inside a REPEATABLE READ snapshot,
+next to a copy of ``user_counters`` taken from the same snapshot, without
+blocking writers. Only the final merge locks ``user_counters``: it adds what
+donations, projects and comments committed since the snapshot put on the
+live counters, so nothing is lost or counted twice, and writes wait just for
+the swap rather than the whole history scan.
+"""
+import asyncio
+import json
+from sqlalchemy import func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from app.database import async_engine
+from app.models import Achievement, UserCounter
+from .engine import COUNTERS, RULES
+
+COLUMNS = ", ".join(COUNTERS)
+
+REBUILD = """
+CREATE TEMPORARY TABLE replay_counters AS
+SELECT user_id,
+    sum(donations) AS donations, sum(donated_total) AS donated_total,
+    sum(projects_backed) AS projects_backed, sum(projects_created) AS projects_created,
+    sum(comments) AS comments
+FROM (
+    SELECT user_id, count(*) AS donations, sum(amount) AS donated_total,
+        count(DISTINCT project_id) AS projects_backed, 0 AS projects_created, 0 AS comments
+    FROM transactions WHERE status = 'completed' AND user_id IS NOT NULL GROUP BY user_id
+    UNION ALL
+    SELECT creator_id, 0, 0, 0, count(*), 0
+    FROM projects WHERE creator_id IS NOT NULL GROUP BY creator_id
+    UNION ALL
+    SELECT author_id, 0, 0, 0, 0, count(*)
+    FROM project_comments WHERE author_id IS NOT NULL GROUP BY author_id
+) AS sources
+GROUP BY user_id
+"""
+
+BASELINE = f"CREATE TEMPORARY TABLE replay_baseline AS SELECT user_id, {COLUMNS} FROM user_counters"
+
+# rebuilt + live - baseline: the rebuild plus whatever was counted after the snapshot.
+MERGE = f"""
+CREATE TEMPORARY TABLE replay_merged AS
+SELECT user_id, {", ".join(f"sum({counter}) AS {counter}" for counter in COUNTERS)}
+FROM (
+    SELECT user_id, {COLUMNS} FROM replay_counters
+    UNION ALL
+    SELECT user_id, {COLUMNS} FROM user_counters
+    UNION ALL
+    SELECT user_id, {", ".join(f"-{counter}" for counter in COUNTERS)} FROM replay_baseline
+) AS parts
+GROUP BY user_id
+"""
+
+SWAP = (
+    "LOCK TABLE user_counters IN EXCLUSIVE MODE",
+    MERGE,
+    "DELETE FROM user_counters",
+    f"""
+    INSERT INTO user_counters (user_id, {COLUMNS})
+    SELECT user_id, {COLUMNS} FROM replay_merged
+    WHERE user_id IN (SELECT id FROM users)
+    """,
+)
+
+CLEANUP = "DROP TABLE replay_counters, replay_baseline, replay_merged"
+
+
+def award_statement(rule):
+    return insert(Achievement).from_select(
+        ["id", "user_id", "code", "title", "description", "icon"],
+        select(
+            func.gen_random_uuid(), UserCounter.user_id, literal(rule.code),
+            literal(rule.title), literal(rule.description), literal(rule.icon)
+        ).where(getattr(UserCounter, rule.counter) >= rule.threshold)
+    ).on_conflict_do_nothing(constraint="uq_achievements_user_code")
+
+
+async def replay() -> dict:
+    report = {}
+    async with async_engine.connect() as connection:
+        await connection.execution_options(isolation_level="REPEATABLE READ")
+        async with connection.begin():
+            await connection.execute(text(REBUILD))
+            await connection.execute(text(BASELINE))
+
+        await connection.execution_options(isolation_level="READ COMMITTED")
+        async with connection.begin():
+            for statement in SWAP:
+                result = await connection.execute(text(statement))
+            report["users"] = result.rowcount
+            await connection.execute(text(CLEANUP))
+
+        report["rules_crossed"] = 0
+        async with connection.begin():
+            for rule in RULES:
+                report["rules_crossed"] += (await connection.execute(award_statement(rule))).rowcount
+    return report
+
+
+async def _main():
+    try:
+        print(json.dumps(await replay(), indent=2))
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -10,9 +10,6 @@ from .models import (
 from .database import engine
 from .security import SECRET_KEY, ALGORITHM
 
-admin_app = FastAPI()
-admin = Admin(app=admin_app, engine=engine)
-
 class AdminAuth(AuthenticationBackend):
     async def authenticate(self, request: Request) -> bool:
         auth_header = request.headers.get("Authorization")
@@ -97,7 +94,7 @@ class UpdateAdmin(ModelView, model=ProjectUpdate):
 
 
 class AchievementAdmin(ModelView, model=Achievement):
-    column_list = [Achievement.id, Achievement.user_id, Achievement.title, Achievement.earned_at]
+    column_list = [Achievement.id, Achievement.user_id, Achievement.code, Achievement.title, Achievement.earned_at]
     column_sortable_list = [Achievement.earned_at]
     name = "Achievement"
     name_plural = "Achievements"
@@ -127,12 +124,14 @@ class BackedProjectAdmin(ModelView, model=BackedProject):
     name_plural = "Backed Projects"
 
 
-admin.add_view(UserAdmin)
-admin.add_view(ProjectAdmin)
-admin.add_view(TransactionAdmin)
-admin.add_view(CommentAdmin)
-admin.add_view(UpdateAdmin)
-admin.add_view(AchievementAdmin)
-admin.add_view(VerificationCodeAdmin)
-admin.add_view(EcoWalletAdmin)
-admin.add_view(BackedProjectAdmin)
+ADMIN_VIEWS = [
+    UserAdmin, ProjectAdmin, TransactionAdmin, CommentAdmin, UpdateAdmin,
+    AchievementAdmin, VerificationCodeAdmin, EcoWalletAdmin, BackedProjectAdmin
+]
+
+
+def setup_admin(app: FastAPI) -> Admin:
+    admin = Admin(app, engine, authentication_backend=AdminAuth(SECRET_KEY))
+    for view in ADMIN_VIEWS:
+        admin.add_view(view)
+    return admin
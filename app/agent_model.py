@@ -1,19 +1,110 @@
-import requests
+import asyncio
 import json
-import os
-from dotenv import load_dotenv
+import time
+import httpx
+from app.config import settings
+from app.metrics import record_llm_call
 
-def analyze_title(title, description):
-    load_dotenv()
-    OLLAMA_URL = os.getenv("OLLAMA_URL")
-    headers = {
-        "Accept": "*/*",
-        "Content-Type": "application/json; charset=utf-8",
-        "User-Agent": "python-requests/2.31.0"
-    }
+OLLAMA_MODEL = settings.ollama_model
+PROMPT_VERSION = 1
+
+_client: httpx.AsyncClient | None = None
+
+
+class ModelUnavailable(Exception):
+    pass
+
+
+async def start():
+    global _client
+    _client = httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            settings.ollama_read_timeout, connect=settings.ollama_connect_timeout
+        ),
+        limits=httpx.Limits(max_keepalive_connections=settings.moderation_workers)
+    )
+
+
+async def stop():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def build_goals(items):
+    return "\n".join(
+        f"{index}. {title} - {description}"
+        for index, (title, description) in enumerate(items, start=1)
+    )
+
+
+async def analyze_title(title, description):
+    return await analyze_titles([(title, description)])
 
-    payload = {
-        "model": "llama3.1",
+
+async def analyze_titles(items):
+    if _client is None:
+        raise RuntimeError("Ollama client is not started")
+    started = time.perf_counter()
+    try:
+        result, outcome = await _request_analysis(items)
+    except asyncio.CancelledError:
+        record_llm_call("cancelled", time.perf_counter() - started)
+        raise
+    except Exception:
+        record_llm_call("error", time.perf_counter() - started)
+        raise
+    record_llm_call(outcome, time.perf_counter() - started)
+    if outcome in ("timeout", "http_error"):
+        raise ModelUnavailable(outcome)
+    return result
+
+
+class JSONScanner:
+    """Finds the first complete top-level JSON array or object in streamed text."""
+
+    def __init__(self):
+        self.text = ""
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str):
+        offset = len(self.text)
+        self.text += chunk
+        for position in range(offset, len(self.text)):
+            char = self.text[position]
+            if self._start is None:
+                if char in "[{":
+                    self._start, self._depth = position, 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = self.text[self._start:position + 1]
+                    try:
+                        return json.loads(candidate)
+                    except json.JSONDecodeError:
+                        self._start = None
+        return None
+
+
+def build_payload(items):
+    return {
+        "model": OLLAMA_MODEL,
         "prompt": f"""
     Проанализируй цель краудфандинговой кампании. Для каждой цели укажи:
 
@@ -34,39 +125,57 @@ def analyze_title(title, description):
         {{ "id": 2, "valid": "true", "reason": "Благотворительность: постройка детского дома","e" :"4",  "5":"1", s:"5" }}
     ]
 
-    Вот цель:
-    {title} - {description}
+    Поле id каждого объекта должно совпадать с номером цели в списке ниже.
+
+    Вот цели:
+    {build_goals(items)}
     """,
         "temperature": 0.0,
         "top_p": 0.9,
         "top_k": 20,
         "frequency_penalty": 0.5,
         "presence_penalty": 0.5,
-        "stream": False,
+        "stream": True,
         "json_mode": True
     }
 
-    response = requests.post(
-        OLLAMA_URL,
-        headers=headers,
-        data=json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    )
 
-    if response.status_code == 200:
-        try:
-            json_response = response.json()
+async def _request_analysis(items):
+    headers = {
+        "Accept": "application/x-ndjson",
+        "Content-Type": "application/json; charset=utf-8"
+    }
+    scanner = JSONScanner()
+    answer = {"model": OLLAMA_MODEL, "response": "", "done": False}
 
-            if isinstance(json_response, dict) and 'response' in json_response:
-                raw_response = json_response['response']
-                try:
-                    json_data = json.loads(raw_response)
-                    return json_data, json_response
+    try:
+        async with _client.stream(
+            "POST",
+            settings.ollama_url,
+            headers=headers,
+            content=json.dumps(build_payload(items), ensure_ascii=False).encode("utf-8")
+        ) as response:
+            if response.status_code != 200:
+                return None, "http_error"
 
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    chunk = json.loads(line)
                 except json.JSONDecodeError:
-                    return
-            else:
-                return
-        except json.JSONDecodeError:
-            return
-    else:
-        return
+                    return None, "parse_failure"
+                json_data = scanner.feed(chunk.get("response", ""))
+                answer["response"] = scanner.text
+                if json_data is not None:
+                    # Leaving the block closes the stream, so Ollama stops generating.
+                    return (json_data, answer), "success"
+                if chunk.get("done"):
+                    answer["done"] = True
+                    break
+    except httpx.TimeoutException:
+        return None, "timeout"
+    except httpx.HTTPError:
+        return None, "http_error"
+
+    return None, "parse_failure"
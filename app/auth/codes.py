@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from sqlalchemy import delete, func, select
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import VerificationCode
+
+logger = logging.getLogger(__name__)
+
+
+class CodeStore(ABC):
+    @abstractmethod
+    async def latest_expiry(self, db, email: str) -> datetime | None:
+        ...
+
+    @abstractmethod
+    async def issue(self, db, email: str, code: str, expires_at: datetime):
+        ...
+
+    @abstractmethod
+    async def consume(self, db, email: str, code: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def purge_expired(self) -> int:
+        ...
+
+
+class DatabaseCodeStore(CodeStore):
+    async def latest_expiry(self, db, email: str) -> datetime | None:
+        return await db.scalar(select(func.max(VerificationCode.expires_at)).where(
+            VerificationCode.email == email,
+            VerificationCode.expires_at > datetime.utcnow()
+        ))
+
+    async def issue(self, db, email: str, code: str, expires_at: datetime):
+        db.add(VerificationCode(email=email, code=code, expires_at=expires_at))
+        await db.commit()
+
+    async def consume(self, db, email: str, code: str) -> bool:
+        consumed = await db.scalar(
+            delete(VerificationCode).where(
+                VerificationCode.email == email,
+                VerificationCode.code == code,
+                VerificationCode.expires_at > datetime.utcnow()
+            ).returning(VerificationCode.id)
+        )
+        await db.commit()
+        return consumed is not None
+
+    async def purge_expired(self) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(VerificationCode).where(VerificationCode.expires_at <= datetime.utcnow())
+            )
+            await db.commit()
+            return result.rowcount
+
+
+class MemoryCodeStore(CodeStore):
+    def __init__(self):
+        self._codes: dict[str, dict[str, datetime]] = {}
+
+    async def latest_expiry(self, db, email: str) -> datetime | None:
+        now = datetime.utcnow()
+        expiries = [expires_at for expires_at in self._codes.get(email, {}).values() if expires_at > now]
+        return max(expiries, default=None)
+
+    async def issue(self, db, email: str, code: str, expires_at: datetime):
+        self._codes.setdefault(email, {})[code] = expires_at
+
+    async def consume(self, db, email: str, code: str) -> bool:
+        codes = self._codes.get(email, {})
+        expires_at = codes.pop(code, None)
+        if not codes:
+            self._codes.pop(email, None)
+        return expires_at is not None and expires_at > datetime.utcnow()
+
+    async def purge_expired(self) -> int:
+        now = datetime.utcnow()
+        purged = 0
+        for email in list(self._codes):
+            codes = self._codes[email]
+            for code in [code for code, expires_at in codes.items() if expires_at <= now]:
+                del codes[code]
+                purged += 1
+            if not codes:
+                del self._codes[email]
+        return purged
+
+
+# "memory" keeps codes in this process only and suits single-worker deployments.
+code_store: CodeStore = MemoryCodeStore() if settings.verification_code_store == "memory" else DatabaseCodeStore()
+
+_sweeper: asyncio.Task | None = None
+
+
+async def start():
+    global _sweeper
+    _sweeper = asyncio.create_task(_sweep())
+
+
+async def stop():
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        await asyncio.gather(_sweeper, return_exceptions=True)
+        _sweeper = None
+
+
+async def _sweep():
+    while True:
+        try:
+            purged = await code_store.purge_expired()
+            if purged:
+                logger.info("Purged %s expired verification codes", purged)
+        except Exception:
+            logger.exception("Verification code purge failed")
+        await asyncio.sleep(settings.verification_code_purge_seconds)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas import (
     UserRegister, EmailRequest, VerifyEmailRequest,
     LoginRequest, TwoFARequest, PasswordResetRequest,
@@ -11,15 +12,15 @@ from .service import (
     send_recovered_password
 )
 from app.security import create_access_token
-from app.models import User, VerificationCode
+from app.models import User
+from .codes import code_store
 from ..database import get_db
-from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register", response_model=MessageResponse)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -35,7 +36,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         is_active=False
     )
     db.add(new_user)
-    db.commit()
+    await db.commit()
 
     await send_verification_code(user_data.email, db)
 
@@ -45,20 +46,16 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     )
 
 @router.post("/register-verify-email", response_model=MessageResponse)
-async def verify_email(verify_data: VerifyEmailRequest, db: Session = Depends(get_db)):
-    verification = db.query(VerificationCode).filter(
-        VerificationCode.email == verify_data.email,
-        VerificationCode.code == verify_data.confirm_code,
-        VerificationCode.expires_at > datetime.utcnow()
-    ).first()
-
-    if not verification:
+async def verify_email(verify_data: VerifyEmailRequest, db: AsyncSession = Depends(get_db)):
+    verified = await code_store.consume(db, verify_data.email, verify_data.confirm_code)
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Код неверный или истёк срок действия"
         )
 
-    user = db.query(User).filter(User.email == verify_data.email).first()
+    user = await db.scalar(select(User).where(User.email == verify_data.email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -66,7 +63,7 @@ async def verify_email(verify_data: VerifyEmailRequest, db: Session = Depends(ge
         )
 
     user.is_active = True
-    db.commit()
+    await db.commit()
 
     return MessageResponse(
         email=verify_data.email,
@@ -74,8 +71,8 @@ async def verify_email(verify_data: VerifyEmailRequest, db: Session = Depends(ge
     )
 
 @router.post("/login", response_model=MessageResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == login_data.email).first()
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == login_data.email))
     if not user or not verify_password(login_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,35 +87,33 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     )
 
 @router.post("/2fa", response_model=TokenResponse)
-async def verify_2fa(twofa_data: TwoFARequest, db: Session = Depends(get_db)):
-    verification = db.query(VerificationCode).filter(
-        VerificationCode.email == twofa_data.email,
-        VerificationCode.code == twofa_data.code,
-        VerificationCode.expires_at > datetime.utcnow()
-    ).first()
-
-    if not verification:
+async def verify_2fa(twofa_data: TwoFARequest, db: AsyncSession = Depends(get_db)):
+    verified = await code_store.consume(db, twofa_data.email, twofa_data.code)
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Неверный код или срок действия истёк"
         )
 
-    user = db.query(User).filter(User.email == twofa_data.email).first()
+    user = await db.scalar(select(User).where(User.email == twofa_data.email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Пользователь не найден"
         )
 
-    access_token = create_access_token(data={"email": user.email, "role": user.role})
+    access_token = create_access_token(
+        data={"email": user.email, "role": user.role, "id": str(user.id), "name": user.name}
+    )
     return TokenResponse(
         access_token=access_token,
         token_type="bearer"
     )
 
 @router.post("/password/recovery", response_model=MessageResponse)
-async def password_recovery(email_data: EmailRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email_data.email).first()
+async def password_recovery(email_data: EmailRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == email_data.email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -127,7 +122,7 @@ async def password_recovery(email_data: EmailRequest, db: Session = Depends(get_
 
     new_password = generate_random_password()
     user.password_hash = hash_password(new_password)
-    db.commit()
+    await db.commit()
 
     email_subject = "Восстановление пароля"
     email_body = (
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import smtplib
+import time
+from dataclasses import dataclass, field
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from app.config import settings
+from app.metrics import SMTP_LATENCY
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutgoingEmail:
+    recipients: list[str]
+    subject: str
+    body: str
+    attempts: int = field(default=0)
+
+
+class SMTPSession:
+    def __init__(self):
+        self.server = None
+        self.last_used = 0.0
+
+    def _connect(self):
+        self.close()
+        server = smtplib.SMTP(settings.smtp_server, settings.smtp_port)
+        if settings.smtp_starttls:
+            server.starttls()
+        if settings.password_email:
+            server.login(settings.sender_email, settings.password_email)
+        self.server = server
+
+    def _ensure_connected(self):
+        if self.server is None:
+            self._connect()
+            return
+        if time.monotonic() - self.last_used > settings.smtp_idle_check_seconds:
+            try:
+                status, _ = self.server.noop()
+            except smtplib.SMTPException:
+                status = None
+            if status != 250:
+                self._connect()
+
+    def send(self, email: OutgoingEmail):
+        sender_email = settings.sender_email
+        display_name = settings.display_name
+
+        message = MIMEMultipart()
+        message["From"] = f'"{display_name}" <{sender_email}>'
+        message["To"] = ", ".join(email.recipients)
+        message["Subject"] = email.subject
+        message.attach(MIMEText(email.body, "plain"))
+
+        self._ensure_connected()
+        try:
+            self.server.sendmail(sender_email, email.recipients, message.as_string())
+        except smtplib.SMTPServerDisconnected:
+            self._connect()
+            self.server.sendmail(sender_email, email.recipients, message.as_string())
+        self.last_used = time.monotonic()
+
+    def close(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except smtplib.SMTPException:
+            pass
+        finally:
+            self.server = None
+
+
+_queue: asyncio.Queue | None = None
+_workers: list[asyncio.Task] = []
+# Failed emails waiting out their backoff, keyed by id() of the email.
+_delayed: dict[int, tuple[asyncio.TimerHandle, OutgoingEmail]] = {}
+
+
+def enqueue(recipients: list[str], subject: str, body: str) -> bool:
+    if _queue is None:
+        raise RuntimeError("Outbox is not started")
+    if not recipients:
+        return False
+    try:
+        _queue.put_nowait(OutgoingEmail(recipients=list(recipients), subject=subject, body=body))
+    except asyncio.QueueFull:
+        logger.error("Outbox queue is full, dropping email to %s", recipients)
+        return False
+    return True
+
+
+def _retry(email: OutgoingEmail):
+    _delayed.pop(id(email), None)
+    try:
+        _queue.put_nowait(email)
+    except asyncio.QueueFull:
+        logger.error("Outbox queue is full, dropping retry to %s", email.recipients)
+
+
+async def start():
+    global _queue
+    _queue = asyncio.Queue(maxsize=settings.outbox_queue_size)
+    for _ in range(settings.smtp_pool_size):
+        _workers.append(asyncio.create_task(_worker()))
+
+
+async def stop():
+    if _queue is not None and _workers:
+        # Retries still waiting out their backoff are sent with the rest of the queue.
+        for handle, email in list(_delayed.values()):
+            handle.cancel()
+            _retry(email)
+        try:
+            await asyncio.wait_for(_queue.join(), settings.outbox_drain_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+    dropped = [email for _, email in _delayed.values()]
+    for handle, _ in _delayed.values():
+        handle.cancel()
+    _delayed.clear()
+    while _queue is not None and not _queue.empty():
+        dropped.append(_queue.get_nowait())
+        _queue.task_done()
+    for email in dropped:
+        logger.error("Outbox stopped before sending \"%s\" to %s", email.subject, email.recipients)
+
+
+async def _worker():
+    session = SMTPSession()
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            email = await _queue.get()
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(session.send, email)
+                SMTP_LATENCY.labels("success").observe(time.perf_counter() - started)
+            except Exception:
+                SMTP_LATENCY.labels("failure").observe(time.perf_counter() - started)
+                session.close()
+                email.attempts += 1
+                if email.attempts >= settings.outbox_max_attempts:
+                    logger.exception("Giving up on email to %s", email.recipients)
+                else:
+                    delay = settings.outbox_backoff_seconds * 2 ** (email.attempts - 1)
+                    logger.warning("Email to %s failed, retrying in %.1fs", email.recipients, delay)
+                    _delayed[id(email)] = (loop.call_later(delay, _retry, email), email)
+            finally:
+                _queue.task_done()
+    finally:
+        await asyncio.to_thread(session.close)
@@ -4,9 +4,7 @@ import time
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
 from .email_service import send_verification_email, send_password_email
-from app.models import VerificationCode, User
-from app.database import get_db
-from app.security import create_access_token
+from .codes import code_store
 
 def generate_code() -> str:
     return ''.join([str(random.randint(1, 9)) for _ in range(6)])
@@ -22,13 +20,10 @@ def generate_random_password() -> str:
     return ''.join(random.choice(chars) for _ in range(12))
 
 async def send_verification_code(email: str, db):
-    existing_code = db.query(VerificationCode).filter(
-        VerificationCode.email == email,
-        VerificationCode.expires_at > datetime.utcnow()
-    ).first()
+    latest_expiry = await code_store.latest_expiry(db, email)
 
-    if existing_code:
-        time_left = (existing_code.expires_at - datetime.utcnow()).seconds
+    if latest_expiry:
+        time_left = (latest_expiry - datetime.utcnow()).seconds
         if time_left > 240:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -38,13 +33,7 @@ async def send_verification_code(email: str, db):
     code = generate_code()
     expires_at = datetime.utcnow() + timedelta(minutes=5)
 
-    verification_code = VerificationCode(
-        email=email,
-        code=code,
-        expires_at=expires_at
-    )
-    db.add(verification_code)
-    db.commit()
+    await code_store.issue(db, email, code, expires_at)
 
     await send_verification_email(email, code)
 
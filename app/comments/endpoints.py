@@ -1,18 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.models import ProjectComment, User
 from app.schemas import CommentCreate, CommentResponse
 from app.database import get_db
 from app.security import get_current_user
+from app.achievements import engine as achievements
+from app.events import CommentPosted
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
 @router.post("/new_comment", response_model=CommentResponse)
-def create_comment(
+async def create_comment(
     comment: CommentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     new_comment = ProjectComment(
@@ -23,6 +25,7 @@ def create_comment(
         author_avatar=current_user.avatar
     )
     db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
+    await achievements.record(db, [CommentPosted(current_user.id, comment.project_id)])
+    await db.commit()
+    await db.refresh(new_comment)
     return new_comment
@@ -0,0 +1,83 @@
+import os
+from functools import lru_cache
+from typing import Literal, Optional
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+
+class Settings(BaseModel):
+    db_host: Optional[str] = None
+    db_port: Optional[str] = None
+    db_name: Optional[str] = None
+    db_user: Optional[str] = None
+    db_pass: Optional[str] = None
+    db_create_schema: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0
+    db_replica_host: Optional[str] = None
+    db_replica_port: Optional[str] = None
+
+    jwt_secret_key: Optional[str] = None
+    jwt_algorithm: Optional[str] = None
+    jwt_access_token_expire_minutes: int = 360
+    auth_cache_ttl: int = 30
+    auth_cache_size: int = 10000
+
+    smtp_server: Optional[str] = None
+    smtp_port: int = 587
+    smtp_starttls: bool = True
+    sender_email: Optional[str] = None
+    password_email: Optional[str] = None
+    display_name: Optional[str] = None
+    smtp_pool_size: int = 2
+    smtp_idle_check_seconds: int = 30
+    outbox_queue_size: int = 1000
+    outbox_max_attempts: int = 5
+    outbox_backoff_seconds: float = 1.0
+    outbox_drain_seconds: float = 10.0
+
+    verification_code_store: Literal['db', 'memory'] = 'db'
+    verification_code_purge_seconds: int = 300
+
+    ollama_url: Optional[str] = None
+    ollama_model: str = "llama3.1"
+    ollama_connect_timeout: float = 5.0
+    ollama_read_timeout: float = 60.0
+    ollama_breaker_failures: int = 3
+    ollama_breaker_reset_seconds: float = 30.0
+    moderation_latency_budget_seconds: float = 30.0
+    moderation_workers: int = 2
+    moderation_queue_size: int = 100
+    moderation_batch_size: int = 8
+    moderation_batch_window_ms: int = 200
+    moderation_batch_fallback: bool = True
+    moderation_max_attempts: int = 3
+    moderation_pending_grace_seconds: int = 60
+    analysis_cache_size: int = 1024
+    analysis_cache_ttl: int = 3600
+
+    deadline_check_seconds: int = 60
+
+    live_backend: Literal['local', 'postgres'] = 'local'
+    live_coalesce_ms: int = 500
+    live_subscriber_queue: int = 8
+
+    leaderboard_rebuild_seconds: int = 300
+
+    projects_cache_max_age: int = 10
+    projects_cache_stale_seconds: int = 30
+
+    prometheus_multiproc_dir: Optional[str] = None
+
+
+@lru_cache
+def get_settings() -> Settings:
+    load_dotenv()
+    return Settings.model_validate({key.lower(): value for key, value in os.environ.items()})
+
+
+settings = get_settings()
@@ -1,27 +1,78 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from .config import settings
+from .metrics import TimedQueuePool, instrument_engine
 
-load_dotenv()
+def _location(host, port) -> str:
+    return f"{settings.db_user}:{settings.db_pass}@{host}:{port}/{settings.db_name}"
 
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASS = os.getenv("DB_PASS")
+SQLALCHEMY_DATABASE_URL = f"postgresql://{_location(settings.db_host, settings.db_port)}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{_location(settings.db_host, settings.db_port)}"
 
-SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+POOL_OPTIONS = {
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+    "pool_recycle": settings.db_pool_recycle,
+    "pool_pre_ping": settings.db_pool_pre_ping,
+}
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _async_engine(url: str):
+    connect_args = {}
+    if settings.db_statement_timeout_ms:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+    async_engine = create_async_engine(
+        url, poolclass=TimedQueuePool, connect_args=connect_args, **POOL_OPTIONS
+    )
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+# Sync engine is kept for sqladmin only.
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args=(
+        {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+        if settings.db_statement_timeout_ms else {}
+    ),
+    **POOL_OPTIONS
+)
+
+async_engine = _async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if settings.db_replica_host:
+    replica_engine = _async_engine(
+        f"postgresql+asyncpg://{_location(settings.db_replica_host, settings.db_replica_port or settings.db_port)}"
+    )
+    ReadSessionLocal = async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)
+else:
+    replica_engine = None
+    ReadSessionLocal = AsyncSessionLocal
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db():
+    async with ReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+# Postgres caps one statement at 32767 bind parameters; the slack covers the
+# constants an ON CONFLICT clause adds on top of the VALUES list.
+MAX_BIND_PARAMS = 32767 - 100
+
+def row_batches(table, rows: list[dict]):
+    """Splits a multi-row VALUES list into statements that fit MAX_BIND_PARAMS.
+
+    Columns left out of the rows but carrying a Python-side default still take
+    one parameter per row.
+    """
+    if not rows:
+        return
+    defaults = sum(1 for column in table.columns if column.default is not None and column.key not in rows[0])
+    size = max(1, MAX_BIND_PARAMS // (len(rows[0]) + defaults))
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
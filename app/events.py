@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from uuid import UUID
+
+
+@dataclass(frozen=True)
+class DonationCompleted:
+    user_id: UUID
+    project_id: UUID
+    amount: Decimal
+    new_backer: bool
+
+
+@dataclass(frozen=True)
+class ProjectCreated:
+    user_id: UUID
+    project_id: UUID
+
+
+@dataclass(frozen=True)
+class CommentPosted:
+    user_id: UUID
+    project_id: UUID
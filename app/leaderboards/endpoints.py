@@ -0,0 +1,14 @@
+from typing import Literal
+from fastapi import APIRouter, Query
+from app.responses import FastJSONResponse
+from app.schemas import LeaderboardResponse
+from .service import leaderboards
+
+router = APIRouter(prefix="/leaderboards", tags=["leaderboards"])
+
+@router.get("/{kind}", response_model=LeaderboardResponse, response_class=FastJSONResponse)
+async def get_leaderboard(
+    kind: Literal['top_funded', 'most_backers', 'best_esg', 'top_donors_month'],
+    limit: int = Query(10, ge=1, le=100)
+):
+    return FastJSONResponse(leaderboards.top(kind, limit))
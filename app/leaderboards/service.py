@@ -0,0 +1,185 @@
+"""In-memory leaderboards.
+
+Each board is a Ranking that keeps every candidate's score together with a
+sorted view, so updates cost one bisect and reading the top K is a slice.
+Project boards follow the funding hub, which also carries updates published
+by other workers when LIVE_BACKEND=postgres; moderation, edits, deletions and
+deadlines update them in the worker that made the change. Donor totals only
+see donations handled by this worker, so every board is also rebuilt from
+the database every LEADERBOARD_REBUILD_SECONDS.
+"""
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from sqlalchemy import func, select
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Project as ProjectModel, Transaction, User
+from app.projects.live import hub
+
+logger = logging.getLogger(__name__)
+
+PROJECT_BOARDS = ("top_funded", "most_backers", "best_esg")
+DONOR_BOARD = "top_donors_month"
+KINDS = (*PROJECT_BOARDS, DONOR_BOARD)
+
+
+class Ranking:
+    def __init__(self):
+        self._scores: dict[str, float] = {}
+        self._order: list[tuple[float, str]] = []
+
+    def __len__(self):
+        return len(self._scores)
+
+    def update(self, key: str, score: float):
+        previous = self._scores.get(key)
+        if previous == score:
+            return
+        if previous is not None:
+            del self._order[bisect_left(self._order, (-previous, key))]
+        self._scores[key] = score
+        insort(self._order, (-score, key))
+
+    def add(self, key: str, amount: float):
+        self.update(key, self._scores.get(key, 0.0) + amount)
+
+    def remove(self, key: str):
+        previous = self._scores.pop(key, None)
+        if previous is not None:
+            del self._order[bisect_left(self._order, (-previous, key))]
+
+    def top(self, limit: int) -> list[tuple[str, float]]:
+        return [(key, -score) for score, key in self._order[:limit]]
+
+
+def month_start(now: datetime | None = None) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+class Leaderboards:
+    def __init__(self):
+        self.boards = {kind: Ranking() for kind in KINDS}
+        self.projects: dict[str, dict] = {}
+        self.donors: dict[str, dict] = {}
+        self.month = month_start()
+        self.rebuilt_at: datetime | None = None
+
+    def project_changed(self, project):
+        key = str(project.id)
+        if not project.is_active:
+            self.project_removed(key)
+            return
+        self.projects[key] = {"name": project.title, "category": project.category}
+        self.boards["top_funded"].update(key, float(project.current_amount or 0))
+        self.boards["most_backers"].update(key, float(project.backers or 0))
+        self.boards["best_esg"].update(key, float((project.esg_e or 0) + (project.esg_s or 0) + (project.esg_g or 0)))
+
+    def project_removed(self, project_id):
+        key = str(project_id)
+        self.projects.pop(key, None)
+        for kind in PROJECT_BOARDS:
+            self.boards[kind].remove(key)
+
+    def funding_changed(self, state: dict):
+        key = state.get("project_id")
+        if key not in self.projects:
+            return
+        self.boards["top_funded"].update(key, float(state.get("current_amount") or 0))
+        self.boards["most_backers"].update(key, float(state.get("backers") or 0))
+
+    def donation(self, user_id, amount, name: str | None = None):
+        self._roll_month()
+        key = str(user_id)
+        if name is not None or key not in self.donors:
+            self.donors[key] = {"name": name, "category": None}
+        self.boards[DONOR_BOARD].add(key, float(amount))
+
+    def top(self, kind: str, limit: int) -> dict:
+        if kind == DONOR_BOARD:
+            self._roll_month()
+        details = self.donors if kind == DONOR_BOARD else self.projects
+        entries = [
+            {"rank": rank, "id": key, "score": score, **details.get(key, {"name": None, "category": None})}
+            for rank, (key, score) in enumerate(self.boards[kind].top(limit), start=1)
+        ]
+        return {
+            "kind": kind,
+            "month": self.month.strftime("%Y-%m") if kind == DONOR_BOARD else None,
+            "entries": entries,
+            "rebuilt_at": self.rebuilt_at,
+        }
+
+    def _roll_month(self):
+        current = month_start()
+        if current != self.month:
+            self.month = current
+            self.boards[DONOR_BOARD] = Ranking()
+            self.donors = {}
+
+    async def rebuild(self):
+        month = month_start()
+        async with AsyncSessionLocal() as db:
+            projects = (await db.execute(
+                select(
+                    ProjectModel.id, ProjectModel.title, ProjectModel.category, ProjectModel.is_active,
+                    ProjectModel.current_amount, ProjectModel.backers,
+                    ProjectModel.esg_e, ProjectModel.esg_s, ProjectModel.esg_g
+                ).where(ProjectModel.is_active == True)
+            )).all()
+            donors = (await db.execute(
+                select(Transaction.user_id, User.name, func.sum(Transaction.amount).label("total"))
+                .join(User, User.id == Transaction.user_id)
+                .where(Transaction.status == "completed", Transaction.date >= month)
+                .group_by(Transaction.user_id, User.name)
+            )).all()
+
+        fresh = Leaderboards()
+        fresh.month = month
+        for project in projects:
+            fresh.project_changed(project)
+        for donor in donors:
+            fresh.donation(donor.user_id, donor.total, donor.name)
+        # Swap whole structures so readers never see a half-built board.
+        self.boards, self.projects, self.donors, self.month = fresh.boards, fresh.projects, fresh.donors, fresh.month
+        self.rebuilt_at = datetime.now(timezone.utc)
+
+
+leaderboards = Leaderboards()
+
+_task: asyncio.Task | None = None
+
+
+async def record_donations(db, donations):
+    """Credits (user_id, amount) pairs, resolving unknown donor names in one query."""
+    unknown = {user_id for user_id, _ in donations if str(user_id) not in leaderboards.donors}
+    names = dict((await db.execute(select(User.id, User.name).where(User.id.in_(unknown)))).all()) if unknown else {}
+    for user_id, amount in donations:
+        leaderboards.donation(user_id, amount, names.get(user_id))
+
+
+async def start():
+    global _task
+    hub.add_listener(leaderboards.funding_changed)
+    await leaderboards.rebuild()
+    _task = asyncio.create_task(_run())
+
+
+async def stop():
+    global _task
+    hub.remove_listener(leaderboards.funding_changed)
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
+
+
+async def _run():
+    while True:
+        await asyncio.sleep(settings.leaderboard_rebuild_seconds)
+        try:
+            await leaderboards.rebuild()
+        except Exception:
+            logger.exception("Leaderboard rebuild failed")
@@ -1,21 +1,57 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, get_db
-from . import models
-from sqlalchemy.orm import Session
+from .config import settings
+from .database import async_engine, engine, replica_engine
+from .schema import create_schema
 from .auth.endpoints import router as auth_router
 from .projects.endpoints import router as projects_router
 from .users.endpoints import router as users_router
 from .transaction.endpoints import router as transaction_router
 from .comments.endpoints import router as comment_router
-from sqladmin import Admin
-from .admin import AdminAuth
-from app.admin import UserAdmin, ProjectAdmin
-from .security import SECRET_KEY, ALGORITHM
-models.Base.metadata.create_all(bind=engine)
+from .moderation.endpoints import router as moderation_router
+from .leaderboards.endpoints import router as leaderboards_router
+from .admin import setup_admin
+from .metrics import MetricsMiddleware, router as metrics_router
+from .moderation import service as moderation
+from .projects import scheduler as deadlines
+from .projects.live import hub
+from .leaderboards import service as leaderboards
+from .auth import outbox, codes
+from . import agent_model
 
-app = FastAPI()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.db_create_schema:
+        await create_schema()
+
+    await outbox.start()
+    await hub.start()
+    await codes.start()
+    await agent_model.start()
+    await moderation.start()
+    await deadlines.start()
+    await leaderboards.start()
+    try:
+        yield
+    finally:
+        await leaderboards.stop()
+        await deadlines.stop()
+        await moderation.stop()
+        await agent_model.stop()
+        await codes.stop()
+        await hub.stop()
+        await outbox.stop()
+        await async_engine.dispose()
+        if replica_engine is not None:
+            await replica_engine.dispose()
+        engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -30,11 +66,11 @@ app.include_router(projects_router)
 app.include_router(auth_router)
 app.include_router(transaction_router)
 app.include_router(users_router)
+app.include_router(moderation_router)
+app.include_router(leaderboards_router)
+app.include_router(metrics_router)
 
-admin = Admin(app, engine, authentication_backend=AdminAuth(SECRET_KEY))
-
-admin.add_view(UserAdmin)
-admin.add_view(ProjectAdmin)
+setup_admin(app)
 
 
 @app.get("/")
@@ -0,0 +1,121 @@
+import time
+from contextvars import ContextVar
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .config import settings
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"]
+)
+REQUEST_COUNT = Counter(
+    "http_requests_total", "HTTP requests by status", ["method", "route", "status"]
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements per HTTP request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per HTTP request", ["route"]
+)
+DB_QUERY_LATENCY = Histogram("db_query_duration_seconds", "SQL statement latency")
+DB_POOL_WAIT = Histogram("db_pool_checkout_seconds", "Time to check a connection out of the pool")
+LLM_LATENCY = Histogram(
+    "llm_analyze_duration_seconds", "analyze_title latency", ["outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+)
+LLM_CALLS = Counter("llm_analyze_total", "analyze_title calls by outcome", ["outcome"])
+LLM_FALLBACKS = Counter("llm_fallback_total", "Projects scored by the local fallback rules")
+SMTP_LATENCY = Histogram("smtp_send_duration_seconds", "SMTP send latency", ["outcome"])
+
+_request_stats: ContextVar[dict | None] = ContextVar("request_stats", default=None)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _record_query(conn)
+
+    # A failing statement never reaches after_cursor_execute.
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        if context.connection is not None and context.execution_context is not None:
+            _record_query(context.connection)
+
+
+def _record_query(conn):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    DB_QUERY_LATENCY.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats["queries"] += 1
+        stats["seconds"] += elapsed
+
+
+def record_llm_call(outcome: str, elapsed: float):
+    LLM_CALLS.labels(outcome).inc()
+    LLM_LATENCY.labels(outcome).observe(elapsed)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = {"queries": 0, "seconds": 0.0}
+        token = _request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route_path).observe(time.perf_counter() - started)
+            REQUEST_COUNT.labels(method, route_path, str(status_code)).inc()
+            REQUEST_DB_QUERIES.labels(route_path).observe(stats["queries"])
+            REQUEST_DB_SECONDS.labels(route_path).observe(stats["seconds"])
+
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    if settings.prometheus_multiproc_dir:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
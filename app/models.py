@@ -1,23 +1,41 @@
 from sqlalchemy import (
     Column, String, Integer, Numeric, Boolean,
     DateTime, ForeignKey, CheckConstraint, Text,
-    Float
+    Float, Index, BigInteger, Sequence,
+    Computed, UniqueConstraint
 )
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import ENUM, UUID
+from sqlalchemy.dialects.postgresql import ENUM, UUID, TSVECTOR
 from .database import Base
 import uuid
 from datetime import datetime
 
 
+# Every project change takes the next value, which doubles as the project's ETag version.
+catalog_version_seq = Sequence("catalog_version_seq", metadata=Base.metadata)
+
 class VerificationCode(Base):
     __tablename__ = "verification_codes"
 
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, index=True)
-    code = Column(String, index=True)
+    email = Column(String)
+    code = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, index=True)
+
+    __table_args__ = (
+        Index("ix_verification_codes_lookup", "email", "code", "expires_at"),
+    )
+
+class AnalysisCache(Base):
+    __tablename__ = "analysis_cache"
+
+    key = Column(String(64), primary_key=True)
+    model = Column(String(50), nullable=False)
+    prompt_version = Column(Integer, nullable=False, index=True)
+    result = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    expires_at = Column(DateTime)
 
 class User(Base):
     __tablename__ = "users"
@@ -49,21 +67,44 @@ class Project(Base):
     esg_s = Column(Integer, default=0)
     esg_g = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
-    end_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False, index=True)
     creator_name = Column(String(100))
     creator_avatar = Column(String(255))
     is_active = Column(Boolean, default=False)
+    moderation_status = Column(String(20), default="pending", index=True)
+    moderation_reason = Column(Text)
+    version = Column(BigInteger, default=catalog_version_seq.next_value(), onupdate=catalog_version_seq.next_value())
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('russian', coalesce(full_description, '')), 'C')",
+        persisted=True
+    )))
+
+    __table_args__ = (
+        Index("ix_projects_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_projects_active_created", "is_active", "created_at", "id"),
+        Index("ix_projects_active_funded", "is_active", "current_amount", "id"),
+        Index("ix_projects_active_end_date", "is_active", "end_date", "id"),
+    )
 
 class Achievement(Base):
     __tablename__ = "achievements"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    code = Column(String(50))
     title = Column(String, nullable=False)
     description = Column(Text)
     icon = Column(String)
     earned_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_achievements_user_earned", "user_id", "earned_at"),
+        UniqueConstraint("user_id", "code", name="uq_achievements_user_code"),
+    )
+
 class Transaction(Base):
     __tablename__ = "transactions"
 
@@ -77,6 +118,8 @@ class Transaction(Base):
 
     __table_args__ = (
         CheckConstraint("status IN ('completed', 'pending', 'failed')", name="check_status"),
+        Index("ix_transactions_user_date", "user_id", "date", "id"),
+        Index("ix_transactions_date", "date"),
     )
 
 class ProjectUpdate(Base):
@@ -91,6 +134,10 @@ class ProjectUpdate(Base):
     author_name = Column(String)
     author_avatar = Column(String)
 
+    __table_args__ = (
+        Index("ix_project_updates_project_date", "project_id", "date", "id"),
+    )
+
 class ProjectComment(Base):
     __tablename__ = "project_comments"
 
@@ -102,6 +149,10 @@ class ProjectComment(Base):
     author_name = Column(String)
     author_avatar = Column(String)
 
+    __table_args__ = (
+        Index("ix_project_comments_project_date", "project_id", "date", "id"),
+    )
+
 class BackedProject(Base):
     __tablename__ = "backed_projects"
 
@@ -115,3 +166,17 @@ class EcoWallet(Base):
     co2_saved = Column(Numeric, default=0)
     trees_planted = Column(Integer, default=0)
     water_saved = Column(Numeric, default=0)
+    # Fraction of the next tree carried over between donations.
+    tree_progress = Column(Numeric, default=0)
+    total_donated = Column(Numeric, default=0)
+    donations_count = Column(Integer, default=0)
+
+class UserCounter(Base):
+    __tablename__ = "user_counters"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    donations = Column(Integer, nullable=False, default=0)
+    donated_total = Column(Numeric, nullable=False, default=0)
+    projects_backed = Column(Integer, nullable=False, default=0)
+    projects_created = Column(Integer, nullable=False, default=0)
+    comments = Column(Integer, nullable=False, default=0)
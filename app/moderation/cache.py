@@ -0,0 +1,95 @@
+import hashlib
+import json
+import unicodedata
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from app.agent_model import OLLAMA_MODEL, PROMPT_VERSION
+from app.cache import TTLCache
+from app.config import settings
+from app.models import AnalysisCache
+
+_memory = TTLCache(settings.analysis_cache_size, settings.analysis_cache_ttl)
+
+stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+
+def _normalize(text) -> str:
+    text = unicodedata.normalize("NFKC", text or "")
+    return " ".join(text.lower().split())
+
+
+def cache_key(title, description) -> str:
+    raw = "\x1f".join([
+        _normalize(title),
+        _normalize(description),
+        OLLAMA_MODEL,
+        str(PROMPT_VERSION),
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def get_many(db, keys) -> dict:
+    found = {}
+    missing = []
+    for key in keys:
+        result = _memory.get(key)
+        if result is None:
+            missing.append(key)
+        else:
+            found[key] = result
+            stats["memory_hits"] += 1
+
+    if missing:
+        rows = (await db.scalars(select(AnalysisCache).where(
+            AnalysisCache.key.in_(missing),
+            AnalysisCache.prompt_version == PROMPT_VERSION
+        ))).all()
+        for row in rows:
+            result = json.loads(row.result)
+            _memory.set(row.key, result)
+            found[row.key] = result
+            stats["db_hits"] += 1
+        stats["misses"] += len(missing) - len(rows)
+
+    return found
+
+
+async def put_many(db, entries: dict):
+    if not entries:
+        return
+    for key, result in entries.items():
+        _memory.set(key, result)
+
+    statement = insert(AnalysisCache).values([
+        {
+            "key": key,
+            "model": OLLAMA_MODEL,
+            "prompt_version": PROMPT_VERSION,
+            "result": json.dumps(result, ensure_ascii=False),
+        }
+        for key, result in entries.items()
+    ])
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[AnalysisCache.key],
+        set_={"result": statement.excluded.result, "created_at": statement.excluded.created_at}
+    ))
+
+
+async def purge_stale(db) -> int:
+    result = await db.execute(
+        delete(AnalysisCache).where(AnalysisCache.prompt_version != PROMPT_VERSION)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+def get_stats() -> dict:
+    lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+    hits = stats["memory_hits"] + stats["db_hits"]
+    return {
+        **stats,
+        "hit_ratio": hits / lookups if lookups else 0.0,
+        "memory_size": len(_memory),
+        "model": OLLAMA_MODEL,
+        "prompt_version": PROMPT_VERSION,
+    }
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.models import User
+from app.security import get_current_user
+from app.projects import scheduler as deadlines
+from . import cache as analysis_cache
+from . import service as moderation
+
+router = APIRouter(prefix="/moderation", tags=["moderation"])
+
+@router.get("/stats")
+def get_moderation_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not admin"
+        )
+
+    return {
+        "queue_size": moderation.queue_size(),
+        "breaker": moderation.breaker.state,
+        "cache": analysis_cache.get_stats(),
+        "deadlines": deadlines.last_run
+    }
@@ -0,0 +1,23 @@
+KEYWORDS = {
+    "e": ("эколог", "природ", "лес", "дерев", "парк", "вод", "отход", "мусор", "переработ", "климат", "энерг", "солнечн"),
+    "s": ("дет", "школ", "образован", "здоров", "больниц", "приют", "волонт", "пожил", "инвалид", "помощ", "сообществ"),
+    "g": ("прозрачн", "отчет", "отчёт", "управлен", "аудит", "контрол", "этик", "коррупц", "открыт"),
+}
+CATEGORY_DIMENSION = {"ecology": "e", "social": "s", "governance": "g"}
+RED_FLAGS = ("автомобил", "машин", "отпуск", "казино", "кредит", "долг", "айфон", "свадьб")
+
+
+def score(title: str, description: str | None, category: str | None) -> dict:
+    text = f"{title} {description or ''}".lower()
+    flags = [stem for stem in RED_FLAGS if stem in text]
+
+    result = {"valid": "doubt"}
+    for dimension, stems in KEYWORDS.items():
+        base = 3 if CATEGORY_DIMENSION.get(category) == dimension else 1
+        result[dimension] = 1 if flags else min(base + sum(stem in text for stem in stems), 5)
+
+    if flags:
+        result["reason"] = f"Provisional score, needs review: possible personal goal ({', '.join(flags)})"
+    else:
+        result["reason"] = "Provisional score from keyword rules, needs review by the model"
+    return result
@@ -0,0 +1,325 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from uuid import UUID
+from app.agent_model import ModelUnavailable, analyze_title, analyze_titles
+from app.auth.email_service import send_email_to_admins
+from app.config import settings
+from sqlalchemy import select
+from app.database import AsyncSessionLocal
+from app.metrics import LLM_FALLBACKS
+from app.models import Project
+from app.moderation import cache as analysis_cache
+from app.moderation import fallback
+from app.moderation.breaker import CircuitBreaker
+from app.leaderboards.service import leaderboards
+
+logger = logging.getLogger(__name__)
+
+_queue: asyncio.Queue | None = None
+_slots: asyncio.Semaphore | None = None
+_batcher: asyncio.Task | None = None
+_batches: set[asyncio.Task] = set()
+_sweeper: asyncio.Task | None = None
+_queued: set[str] = set()
+# Consecutive unusable model answers per project, reset by a usable one.
+_failures: dict[str, int] = {}
+
+breaker = CircuitBreaker(settings.ollama_breaker_failures, settings.ollama_breaker_reset_seconds)
+
+
+def is_queue_full() -> bool:
+    return _queue is not None and _queue.full()
+
+
+def queue_size() -> int:
+    return _queue.qsize() if _queue is not None else 0
+
+
+def enqueue(project_id) -> bool:
+    if _queue is None:
+        return False
+    project_id = str(project_id)
+    if project_id in _queued:
+        return True
+    try:
+        _queue.put_nowait(project_id)
+    except asyncio.QueueFull:
+        logger.warning("Moderation queue is full, project %s stays pending", project_id)
+        return False
+    _queued.add(project_id)
+    return True
+
+
+async def start():
+    global _queue, _slots, _batcher, _sweeper
+    _queue = asyncio.Queue(maxsize=settings.moderation_queue_size)
+    _slots = asyncio.Semaphore(settings.moderation_workers)
+    _batcher = asyncio.create_task(_collect_batches())
+    _sweeper = asyncio.create_task(_sweep())
+
+    async with AsyncSessionLocal() as db:
+        await analysis_cache.purge_stale(db)
+        # "failed" is left over from before unusable answers were retried.
+        pending = await db.scalars(
+            select(Project.id).where(Project.moderation_status.in_(("pending", "failed")))
+            .limit(settings.moderation_queue_size)
+        )
+        for project_id in pending:
+            enqueue(project_id)
+
+
+async def stop():
+    global _batcher, _sweeper
+    tasks = list(_batches)
+    for task in (_batcher, _sweeper):
+        if task is not None:
+            tasks.append(task)
+    _batcher = _sweeper = None
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _batches.clear()
+    _queued.clear()
+    _failures.clear()
+
+
+async def _sweep():
+    """Re-queue projects that fell out of the queue.
+
+    Pending projects miss the queue when it was full at enqueue time or when
+    their batch failed; provisionally scored ones wait for the model to be
+    reachable again.
+    """
+    while True:
+        await asyncio.sleep(settings.ollama_breaker_reset_seconds)
+        try:
+            await _requeue("pending", settings.moderation_queue_size, settings.moderation_pending_grace_seconds)
+            if not breaker.ready():
+                continue
+            # While the breaker is half-open a single batch is enough to probe the model.
+            limit = settings.moderation_queue_size if breaker.state == "closed" else settings.moderation_batch_size
+            await _requeue("provisional", limit)
+        except Exception:
+            logger.exception("Re-queueing projects failed")
+
+
+async def _requeue(status: str, limit: int, grace_seconds: int = 0):
+    query = select(Project.id).where(Project.moderation_status == status)
+    if grace_seconds:
+        query = query.where(Project.created_at < datetime.utcnow() - timedelta(seconds=grace_seconds))
+    async with AsyncSessionLocal() as db:
+        project_ids = (await db.scalars(query.order_by(Project.created_at).limit(limit))).all()
+    for project_id in project_ids:
+        if not enqueue(project_id):
+            break
+
+
+async def _collect_batches():
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _queue.get()]
+        deadline = loop.time() + settings.moderation_batch_window_ms / 1000
+        while len(batch) < settings.moderation_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        await _slots.acquire()
+        task = asyncio.create_task(_run_batch(batch))
+        _batches.add(task)
+        task.add_done_callback(_batches.discard)
+
+
+async def _run_batch(project_ids: list[str]):
+    try:
+        await moderate_projects(project_ids)
+    except Exception:
+        logger.exception("Moderation of projects %s failed", project_ids)
+    finally:
+        _slots.release()
+        for project_id in project_ids:
+            _queued.discard(project_id)
+            _queue.task_done()
+
+
+async def moderate_projects(project_ids: list[str]):
+    async with AsyncSessionLocal() as db:
+        projects = await db.scalars(select(Project).where(
+            Project.id.in_([UUID(project_id) for project_id in project_ids]),
+            Project.moderation_status.in_(("pending", "provisional", "failed"))
+        ))
+        items = [
+            (str(project.id), project.title, project.full_description or project.description)
+            for project in projects
+        ]
+        keys = {
+            project_id: analysis_cache.cache_key(title, description)
+            for project_id, title, description in items
+        }
+        cached = await analysis_cache.get_many(db, keys.values())
+    if not items:
+        return
+
+    results = {
+        project_id: (cached[key], cached[key])
+        for project_id, key in keys.items() if key in cached
+    }
+    misses = [item for item in items if item[0] not in results]
+    fresh, unavailable = {}, set()
+    if misses:
+        try:
+            fresh = await _analyze_with_breaker(misses)
+        except ModelUnavailable as exc:
+            logger.warning("Model unavailable (%s), scoring %s projects with fallback rules", exc, len(misses))
+            unavailable = {project_id for project_id, _, _ in misses}
+    results.update(fresh)
+
+    async with AsyncSessionLocal() as db:
+        projects = (await db.scalars(select(Project).where(
+            Project.id.in_([UUID(project_id) for project_id, _, _ in items])
+        ))).all()
+        rejected = []
+        for project in projects:
+            if str(project.id) in unavailable:
+                apply_fallback(project)
+                continue
+            analysis_result, full_answer = results.get(str(project.id), (None, None))
+            if isinstance(analysis_result, dict):
+                _failures.pop(str(project.id), None)
+                status = apply_analysis(project, analysis_result)
+            else:
+                status = apply_unusable(project)
+            if status in ("rejected", "review"):
+                rejected.append((str(project.id), project.title, analysis_result, full_answer))
+        await analysis_cache.put_many(db, {
+            keys[project_id]: analysis_result
+            for project_id, (analysis_result, _) in fresh.items()
+            if isinstance(analysis_result, dict)
+        })
+        await db.commit()
+
+        for project in projects:
+            leaderboards.project_changed(project)
+        for project_id, title, analysis_result, full_answer in rejected:
+            await send_email_to_admins(project_id, title, analysis_result, full_answer, db)
+
+
+async def _analyze_with_breaker(items):
+    if not breaker.allow():
+        raise ModelUnavailable("circuit open")
+    try:
+        results = await asyncio.wait_for(_analyze_batch(items), settings.moderation_latency_budget_seconds)
+    except (ModelUnavailable, asyncio.TimeoutError) as exc:
+        breaker.record_failure()
+        raise ModelUnavailable(str(exc) or "latency budget exceeded") from exc
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return results
+
+
+async def _analyze_batch(items):
+    analysis = await analyze_titles([(title, description) for _, title, description in items])
+    results = {}
+    analysis_results, _ = analysis if analysis else (None, None)
+    if isinstance(analysis_results, dict):
+        analysis_results = [analysis_results]
+    for analysis_result in analysis_results or []:
+        index = _item_index(analysis_result, len(items))
+        if index is not None:
+            results[items[index][0]] = (analysis_result, analysis_result)
+
+    missing = [item for item in items if item[0] not in results]
+    if missing and len(items) > 1 and settings.moderation_batch_fallback:
+        for project_id, title, description in missing:
+            analysis = await analyze_title(title, description)
+            results[project_id] = _first_result(analysis)
+    return results
+
+
+def _item_index(analysis_result, size: int):
+    if not isinstance(analysis_result, dict):
+        return None
+    if size == 1:
+        return 0
+    try:
+        index = int(analysis_result.get("id")) - 1
+    except (TypeError, ValueError):
+        return None
+    return index if 0 <= index < size else None
+
+
+def _first_result(analysis):
+    if not analysis:
+        return None, None
+    analysis_results, full_answer = analysis
+    if isinstance(analysis_results, dict):
+        analysis_results = [analysis_results]
+    if not isinstance(analysis_results, list) or not analysis_results:
+        return None, full_answer
+    return analysis_results[0], full_answer
+
+
+def apply_analysis(project: Project, analysis_result: dict) -> str:
+    verdict = str(analysis_result.get("valid", "")).lower()
+    project.moderation_reason = analysis_result.get("reason")
+    if verdict == "true":
+        project.moderation_status = "approved"
+        project.esg_e = _score(analysis_result.get("e"))
+        project.esg_s = _score(analysis_result.get("s"))
+        project.esg_g = _score(analysis_result.get("g"))
+        project.is_active = True
+    else:
+        project.moderation_status = "review" if verdict == "doubt" else "rejected"
+        project.esg_e = 0
+        project.esg_s = 0
+        project.esg_g = 0
+        project.is_active = False
+    return project.moderation_status
+
+
+def apply_fallback(project: Project) -> str:
+    result = fallback.score(project.title, project.full_description or project.description, project.category)
+    LLM_FALLBACKS.inc()
+    project.moderation_status = "provisional"
+    project.moderation_reason = result["reason"]
+    project.esg_e = result["e"]
+    project.esg_s = result["s"]
+    project.esg_g = result["g"]
+    project.is_active = False
+    return project.moderation_status
+
+
+def apply_unusable(project: Project) -> str:
+    """Scores a project the model gave no usable answer for.
+
+    It stays provisional, and so keeps being retried, until the model has
+    failed it moderation_max_attempts times in a row; then it goes to the
+    admins for review.
+    """
+    project_id = str(project.id)
+    _failures[project_id] = _failures.get(project_id, 0) + 1
+    if _failures[project_id] < settings.moderation_max_attempts:
+        return apply_fallback(project)
+
+    _failures.pop(project_id, None)
+    project.moderation_status = "review"
+    project.moderation_reason = "Model returned no usable result"
+    project.is_active = False
+    return project.moderation_status
+
+
+def _score(value) -> int:
+    try:
+        return min(max(int(value), 0), 5)
+    except (TypeError, ValueError):
+        return 0
@@ -0,0 +1,46 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from fastapi import Request
+from app.config import settings
+
+
+def project_etag(version) -> str:
+    return f'"p{version}"'
+
+
+def catalog_etag(versions, next_cursor: str | None, request: Request) -> str:
+    # Built from the page itself: row versions are written in the same transaction
+    # as the change, so the tag can never run ahead of the body it describes.
+    digest = hashlib.blake2b(digest_size=16)
+    for key, value in sorted(request.query_params.multi_items()):
+        digest.update(f"{key}={value}&".encode())
+    for project_id, version in versions:
+        digest.update(f"{project_id}:{version};".encode())
+    digest.update(str(next_cursor).encode())
+    return f'"c{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [candidate.strip().removeprefix("W/") for candidate in header.split(",")]
+    return etag in candidates
+
+
+def cache_headers(etag: str, last_modified: datetime | None = None) -> dict:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={settings.projects_cache_max_age}, "
+            f"stale-while-revalidate={settings.projects_cache_stale_seconds}"
+        ),
+    }
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
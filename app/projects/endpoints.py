@@ -1,111 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from typing import List
-import uuid
-from datetime import datetime, timedelta, timezone
-from app.security import get_current_user
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Annotated, Optional, Literal
+import asyncio
+import orjson
+from uuid import UUID
+from datetime import datetime
+from app.security import get_current_user, get_current_claims
+from ..database import get_db, get_read_db, AsyncSessionLocal
 from app.models import Project as ProjectModel, User
 from app.schemas import (
     ProjectCreate, ProjectUpdate, Project,
-    ProjectListResponse, ESGRating
+    ProjectSummaryListResponse, ESGRating, ModerationStatusResponse,
+    ProjectFilters, TokenClaims, FeedResponse
 )
-from app.auth.email_service import send_email_to_admins
-from app.agent_model import analyze_title
+from app.responses import FastJSONResponse
+from .service import list_projects, list_feed, search_projects, new_project, naive_utc
+from app.moderation import service as moderation
+from app.achievements import engine as achievements
+from app.events import ProjectCreated
+from .live import hub, funding_state
+from app.leaderboards.service import leaderboards
+from .caching import (
+    catalog_etag, project_etag,
+    etag_matches, cache_headers
+)
+
+LIVE_KEEPALIVE_SECONDS = 15
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
-@router.get("/", response_model=ProjectListResponse)
-def get_projects(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+@router.get("/", response_model=ProjectSummaryListResponse, response_class=FastJSONResponse)
+async def get_projects(
+    request: Request,
+    filters: Annotated[ProjectFilters, Query()],
+    db: AsyncSession = Depends(get_read_db)
+):
+    projects, next_cursor, versions = await list_projects(db, filters)
+    etag = catalog_etag(versions, next_cursor, request)
+    headers = cache_headers(etag)
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return FastJSONResponse({"projects": projects, "next_cursor": next_cursor}, headers=headers)
+
+@router.get("/search", response_model=ProjectSummaryListResponse, response_class=FastJSONResponse)
+async def search_projects_endpoint(
+    q: str = Query(..., min_length=2, max_length=200),
+    category: Optional[Literal['ecology', 'social', 'governance']] = None,
+    active: Optional[bool] = True,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    db_projects = db.query(ProjectModel).filter(ProjectModel.is_active == True).offset(skip).limit(limit).all()
-    projects = [Project.from_orm(project) for project in db_projects]
-    return {"projects": projects}
+    projects, next_cursor = await search_projects(db, q, category, active, cursor, limit)
+    return FastJSONResponse({"projects": projects, "next_cursor": next_cursor})
+
 @router.post("/", response_model=Project, status_code=status.HTTP_201_CREATED)
 async def create_project(
-    request: Request,
     project_data: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    headers = request.headers
-
-    body = await request.body()
-
-    end_date = project_data.end_date
-    if end_date.tzinfo is None:
-        end_date = end_date.replace(tzinfo=timezone.utc)
-
-    analysis_results, full_answer = analyze_title(project_data.title, project_data.full_description)
-    for analysis_result in analysis_results:
-        if analysis_result:
-            print(analysis_result)
-            if analysis_result['valid'] == "true":
-                days_left = (end_date - datetime.now(timezone.utc)).days
-                project = ProjectModel(
-                    id=str(uuid.uuid4()),
-                    title=project_data.title,
-                    description=project_data.description,
-                    full_description=project_data.full_description,
-                    category=project_data.category,
-                    image=project_data.image,
-                    current_amount=0,
-                    target_amount=project_data.target_amount,
-                    days_left=days_left,
-                    backers=0,
-                    esg_e=int(analysis_result["e"]),
-                    esg_s=int(analysis_result["s"]),
-                    esg_g=int(analysis_result["g"]),
-                    created_at=datetime.now(timezone.utc),
-                    end_date=end_date,
-                    creator_id=str(current_user.id),
-                    creator_name=current_user.name,
-                    creator_avatar=current_user.avatar,
-                    is_active=True
-                )
-                db.add(project)
-                db.commit()
-                db.refresh(project)
-            else:
-                days_left = (end_date - datetime.now(timezone.utc)).days
-                project = ProjectModel(
-                    id=str(uuid.uuid4()),
-                    title=project_data.title,
-                    description=project_data.description,
-                    full_description=project_data.full_description,
-                    category=project_data.category,
-                    image=project_data.image,
-                    current_amount=0,
-                    target_amount=project_data.target_amount,
-                    days_left=days_left,
-                    backers=0,
-                    esg_e=0,
-                    esg_s=0,
-                    esg_g=0,
-                    created_at=datetime.now(timezone.utc),
-                    end_date=end_date,
-                    creator_id=str(current_user.id),
-                    creator_name=current_user.name,
-                    creator_avatar=current_user.avatar,
-                    is_active=False
-                )
-                db.add(project)
-                db.commit()
-                db.refresh(project)
-                await send_email_to_admins(str(uuid.uuid4()), project_data.title, analysis_result, full_answer, db)
+    if moderation.is_queue_full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Moderation queue is full, try again later"
+        )
 
+    project = new_project(project_data, current_user)
+    db.add(project)
+    await achievements.record(db, [ProjectCreated(current_user.id, project.id)])
+    await db.commit()
+    await db.refresh(project)
+
+    moderation.enqueue(project.id)
 
     return Project.from_orm(project)
 
 @router.get("/{project_id}", response_model=Project)
-def get_project(
-    project_id: str,
-    db: Session = Depends(get_db)
+async def get_project(
+    project_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    project = db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+    if request.headers.get("if-none-match"):
+        current = (await db.execute(
+            select(ProjectModel.version, ProjectModel.updated_at).where(ProjectModel.id == project_id)
+        )).first()
+        if current is not None:
+            etag = project_etag(current.version)
+            if etag_matches(request, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers=cache_headers(etag, current.updated_at)
+                )
+
+    project = await db.get(ProjectModel, project_id)
 
     if not project:
         raise HTTPException(
@@ -113,16 +106,129 @@ def get_project(
             detail="Project not found"
         )
 
+    response.headers.update(cache_headers(project_etag(project.version), project.updated_at))
     return Project.from_orm(project)
 
+@router.get("/{project_id}/feed", response_model=FeedResponse)
+async def get_project_feed(
+    project_id: UUID,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    project = await db.get(ProjectModel, project_id)
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    items, next_cursor = await list_feed(db, project_id, cursor, limit)
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/{project_id}/live")
+async def stream_project_funding(
+    project_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    project = await db.get(ProjectModel, project_id)
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    initial = funding_state(project.id, project.current_amount, project.target_amount, project.backers)
+    await db.close()
+
+    async def events():
+        async with hub.subscribe(project_id) as queue:
+            yield b"data: " + orjson.dumps(initial) + b"\n\n"
+            while not await request.is_disconnected():
+                try:
+                    state = await asyncio.wait_for(queue.get(), LIVE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield b"data: " + orjson.dumps(state) + b"\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.websocket("/{project_id}/ws")
+async def project_funding_socket(websocket: WebSocket, project_id: UUID):
+    async with AsyncSessionLocal() as db:
+        project = await db.get(ProjectModel, project_id)
+    if not project:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    async with hub.subscribe(project_id) as queue:
+        # An idle project never sends, so the disconnect has to be read from the client side.
+        tasks = {
+            asyncio.create_task(_send_funding(websocket, queue, project)),
+            asyncio.create_task(_wait_disconnect(websocket)),
+        }
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+async def _send_funding(websocket: WebSocket, queue: asyncio.Queue, project: ProjectModel):
+    try:
+        await websocket.send_json(
+            funding_state(project.id, project.current_amount, project.target_amount, project.backers)
+        )
+        while True:
+            await websocket.send_json(await queue.get())
+    except WebSocketDisconnect:
+        pass
+
+async def _wait_disconnect(websocket: WebSocket):
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+@router.get("/{project_id}/moderation", response_model=ModerationStatusResponse)
+async def get_moderation_status(
+    project_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    project = await db.get(ProjectModel, project_id)
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    if project.creator_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view moderation of your own projects"
+        )
+
+    return ModerationStatusResponse(
+        project_id=project.id,
+        status=project.moderation_status,
+        is_active=project.is_active,
+        esg_rating=ESGRating(e=project.esg_e, s=project.esg_s, g=project.esg_g),
+        reason=project.moderation_reason
+    )
+
 @router.patch("/{project_id}", response_model=Project)
-def update_project(
-    project_id: str,
+async def update_project(
+    project_id: UUID,
     project_data: ProjectUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
-    project = db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+    project = await db.get(ProjectModel, project_id)
 
     if not project:
         raise HTTPException(
@@ -144,22 +250,27 @@ def update_project(
             project.esg_s = value.get('s', project.esg_s)
             project.esg_g = value.get('g', project.esg_g)
         elif field == "end_date":
-            setattr(project, field, value)
-            project.days_left = (value - datetime.now(timezone.utc)).days
+            project.end_date = naive_utc(value)
+            project.days_left = (project.end_date - datetime.utcnow()).days
         elif field not in ["updates", "comments"]:
             setattr(project, field, value)
 
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
+    leaderboards.project_changed(project)
+
+    await hub.publish(funding_state(
+        project.id, project.current_amount, project.target_amount, project.backers
+    ))
     return Project.from_orm(project)
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(
-    project_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def delete_project(
+    project_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
-    project = db.query(ProjectModel).filter(ProjectModel.id == project_id).first()
+    project = await db.get(ProjectModel, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -172,6 +283,7 @@ def delete_project(
             detail="You can only delete your own projects"
         )
 
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
+    leaderboards.project_removed(project_id)
     return None
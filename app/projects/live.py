@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+import orjson
+from app.config import settings
+from app.database import SQLALCHEMY_DATABASE_URL
+
+LIVE_CHANNEL = "project_funding"
+
+logger = logging.getLogger(__name__)
+
+
+def funding_state(project_id, current_amount, target_amount, backers) -> dict:
+    return {
+        "project_id": str(project_id),
+        "current_amount": current_amount or 0,
+        "target_amount": target_amount,
+        "backers": backers or 0,
+    }
+
+
+class LocalBroadcast:
+    async def start(self, receive):
+        self._receive = receive
+
+    async def publish(self, payload: bytes):
+        self._receive(payload)
+
+    async def stop(self):
+        pass
+
+
+class PostgresBroadcast:
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._listener = None
+        self._publisher = None
+        self._lock = asyncio.Lock()
+
+    async def start(self, receive):
+        import asyncpg
+
+        self._listener = await asyncpg.connect(self.dsn)
+        self._publisher = await asyncpg.connect(self.dsn)
+        await self._listener.add_listener(
+            LIVE_CHANNEL, lambda connection, pid, channel, payload: receive(payload.encode())
+        )
+
+    async def publish(self, payload: bytes):
+        async with self._lock:
+            await self._publisher.execute("SELECT pg_notify($1, $2)", LIVE_CHANNEL, payload.decode())
+
+    async def stop(self):
+        for connection in (self._listener, self._publisher):
+            if connection is not None:
+                await connection.close()
+        self._listener = None
+        self._publisher = None
+
+
+class FundingHub:
+    def __init__(self, backend, interval: float, queue_size: int):
+        self.backend = backend
+        self.interval = interval
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._pending: dict[str, dict] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._last_sent: dict[str, float] = {}
+        self._listeners: list = []
+
+    async def start(self):
+        await self.backend.start(self._receive)
+
+    async def stop(self):
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        await self.backend.stop()
+
+    async def publish(self, state: dict):
+        try:
+            await self.backend.publish(orjson.dumps(state))
+        except Exception:
+            logger.exception("Failed to publish funding update for %s", state.get("project_id"))
+
+    def add_listener(self, listener):
+        """Calls ``listener(state)`` for every funding update, before coalescing."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @asynccontextmanager
+    async def subscribe(self, project_id):
+        key = str(project_id)
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(key, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[key]
+                    self._pending.pop(key, None)
+                    self._last_sent.pop(key, None)
+                    timer = self._timers.pop(key, None)
+                    if timer is not None:
+                        timer.cancel()
+
+    def _receive(self, payload: bytes):
+        try:
+            state = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            return
+        for listener in self._listeners:
+            try:
+                listener(state)
+            except Exception:
+                logger.exception("Funding listener failed")
+        key = state.get("project_id")
+        if key not in self._subscribers:
+            return
+
+        self._pending[key] = state
+        if key in self._timers:
+            return
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, self._last_sent.get(key, 0.0) + self.interval - loop.time())
+        self._timers[key] = loop.call_later(delay, self._flush, key)
+
+    def _flush(self, key: str):
+        self._timers.pop(key, None)
+        state = self._pending.pop(key, None)
+        if state is None:
+            return
+        self._last_sent[key] = asyncio.get_running_loop().time()
+        for queue in self._subscribers.get(key, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(state)
+
+
+def _make_backend():
+    if settings.live_backend == "postgres":
+        return PostgresBroadcast(SQLALCHEMY_DATABASE_URL)
+    return LocalBroadcast()
+
+
+hub = FundingHub(_make_backend(), settings.live_coalesce_ms / 1000, settings.live_subscriber_queue)
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from datetime import datetime
+from sqlalchemy import Integer, cast, func, update
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Project as ProjectModel
+from app.leaderboards.service import leaderboards
+
+logger = logging.getLogger(__name__)
+
+last_run = {"at": None, "expired": 0, "days_left_at": None, "days_left": 0}
+
+_task: asyncio.Task | None = None
+
+
+def _remaining(now):
+    return func.greatest(cast(func.date_part("day", ProjectModel.end_date - now), Integer), 0)
+
+
+def expire_statement():
+    now = func.timezone("utc", func.now())
+    return (
+        update(ProjectModel)
+        .where(ProjectModel.is_active == True, ProjectModel.end_date <= now)
+        .values(is_active=False, days_left=0)
+        .returning(ProjectModel.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def days_left_statement():
+    now = func.timezone("utc", func.now())
+    remaining = _remaining(now)
+    return (
+        update(ProjectModel)
+        .where(ProjectModel.end_date > now, ProjectModel.days_left.is_distinct_from(remaining))
+        .values(days_left=remaining)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def process_deadlines() -> int:
+    now = datetime.utcnow()
+    # Expiry is an index range scan and runs every tick; days_left touches every
+    # future project, so it is refreshed once per UTC day.
+    refresh = last_run["days_left_at"] is None or last_run["days_left_at"].date() != now.date()
+    async with AsyncSessionLocal() as db:
+        expired = (await db.execute(expire_statement())).scalars().all()
+        if refresh:
+            refreshed = (await db.execute(days_left_statement())).rowcount
+        await db.commit()
+
+    for project_id in expired:
+        leaderboards.project_removed(project_id)
+
+    last_run["at"] = now
+    last_run["expired"] = len(expired)
+    if refresh:
+        last_run["days_left_at"] = now
+        last_run["days_left"] = refreshed
+    if expired:
+        logger.info("Deadline processor closed %s projects", len(expired))
+    return len(expired)
+
+
+async def start():
+    global _task
+    _task = asyncio.create_task(_run())
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
+
+
+async def _run():
+    while True:
+        try:
+            await process_deadlines()
+        except Exception:
+            logger.exception("Deadline processor failed")
+        await asyncio.sleep(settings.deadline_check_seconds)
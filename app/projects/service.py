@@ -0,0 +1,252 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+from fastapi import HTTPException, status
+from sqlalchemy import REAL, String, func, literal, select, tuple_, union_all
+from app.models import Project as ProjectModel, ProjectComment, ProjectUpdate
+from app.schemas import ProjectCreate, ProjectFilters
+
+SUMMARY_COLUMNS = (
+    ProjectModel.id,
+    ProjectModel.title,
+    ProjectModel.description,
+    ProjectModel.category,
+    ProjectModel.image,
+    ProjectModel.current_amount,
+    ProjectModel.target_amount,
+    ProjectModel.days_left,
+    ProjectModel.backers,
+    ProjectModel.esg_e,
+    ProjectModel.esg_s,
+    ProjectModel.esg_g,
+    ProjectModel.created_at,
+    ProjectModel.end_date,
+    ProjectModel.creator_id,
+    ProjectModel.creator_name,
+    ProjectModel.creator_avatar,
+)
+
+SORT_ORDERS = {
+    "newest": (ProjectModel.created_at, True),
+    "most_funded": (ProjectModel.current_amount, True),
+    "ending_soon": (ProjectModel.end_date, False),
+}
+
+
+def naive_utc(value: datetime) -> datetime:
+    # Project timestamps are UTC in columns without a time zone, and asyncpg
+    # refuses aware datetimes for those.
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def new_project(project_data: ProjectCreate, user) -> ProjectModel:
+    end_date = naive_utc(project_data.end_date)
+    now = datetime.utcnow()
+    return ProjectModel(
+        id=uuid.uuid4(),
+        title=project_data.title,
+        description=project_data.description,
+        full_description=project_data.full_description,
+        category=project_data.category,
+        image=project_data.image,
+        current_amount=0,
+        target_amount=project_data.target_amount,
+        days_left=(end_date - now).days,
+        backers=0,
+        esg_e=0,
+        esg_s=0,
+        esg_g=0,
+        created_at=now,
+        end_date=end_date,
+        creator_id=user.id,
+        creator_name=user.name,
+        creator_avatar=user.avatar,
+        is_active=False,
+        moderation_status="pending"
+    )
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(kind: str, *values) -> str:
+    payload = json.dumps([kind, *[_dump(value) for value in values]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        payload = None
+    if not isinstance(payload, list) or len(payload) != 3 or payload[0] != kind:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    # Every cursor ends with the row id, which has to reach asyncpg as a UUID.
+    try:
+        last_id = uuid.UUID(payload[2])
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return [_load(payload[1]), last_id]
+
+
+def keyset_after(column, id_column, descending: bool, value, last_id):
+    # Bind with the column types: an untyped id is sent as VARCHAR and uuid < varchar fails.
+    bound = tuple_(literal(value, column.type), literal(last_id, id_column.type))
+    if descending:
+        return tuple_(column, id_column) < bound
+    return tuple_(column, id_column) > bound
+
+
+def keyset_order(column, id_column, descending: bool):
+    if descending:
+        return [column.desc(), id_column.desc()]
+    return [column.asc(), id_column.asc()]
+
+
+def apply_filters(query, filters: ProjectFilters):
+    if filters.category is not None:
+        query = query.filter(ProjectModel.category == filters.category)
+
+    for name in ("esg_e", "esg_s", "esg_g"):
+        column = getattr(ProjectModel, name)
+        low = getattr(filters, f"{name}_min")
+        high = getattr(filters, f"{name}_max")
+        if low is not None:
+            query = query.filter(column >= low)
+        if high is not None:
+            query = query.filter(column <= high)
+
+    funded = ProjectModel.current_amount * 100 / ProjectModel.target_amount
+    if filters.funded_min is not None:
+        query = query.filter(funded >= filters.funded_min)
+    if filters.funded_max is not None:
+        query = query.filter(funded <= filters.funded_max)
+
+    if filters.deadline_after is not None:
+        query = query.filter(ProjectModel.end_date >= filters.deadline_after)
+    if filters.deadline_before is not None:
+        query = query.filter(ProjectModel.end_date <= filters.deadline_before)
+
+    return query
+
+
+def summary_row(row) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "category": row.category,
+        "image": row.image,
+        "current_amount": row.current_amount or 0,
+        "target_amount": row.target_amount,
+        "days_left": row.days_left,
+        "backers": row.backers or 0,
+        "esg_rating": {"e": row.esg_e, "s": row.esg_s, "g": row.esg_g},
+        "created_at": row.created_at,
+        "end_date": row.end_date,
+        "creator_id": row.creator_id,
+        "creator_name": row.creator_name,
+        "creator_avatar": row.creator_avatar,
+    }
+
+
+async def list_projects(db, filters: ProjectFilters):
+    column, descending = SORT_ORDERS[filters.sort]
+    query = select(*SUMMARY_COLUMNS, ProjectModel.version).where(ProjectModel.is_active == True)
+    query = apply_filters(query, filters)
+
+    if filters.cursor:
+        value, last_id = decode_cursor(filters.cursor, filters.sort)
+        query = query.filter(keyset_after(column, ProjectModel.id, descending, value, last_id))
+
+    query = query.order_by(*keyset_order(column, ProjectModel.id, descending)).limit(filters.limit + 1)
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > filters.limit:
+        rows = rows[:filters.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(filters.sort, getattr(last, column.key), str(last.id))
+    versions = [(row.id, row.version) for row in rows]
+    return [summary_row(row) for row in rows], next_cursor, versions
+
+
+def search_query(q: str, category, active, after, limit: int):
+    ts_query = func.websearch_to_tsquery("russian", q)
+    # ts_rank_cd returns real, which compares exactly against the float8 cursor bind.
+    rank = func.ts_rank_cd(ProjectModel.search_vector, ts_query, type_=REAL)
+    query = select(*SUMMARY_COLUMNS, rank.label("rank")).where(
+        ProjectModel.search_vector.op("@@")(ts_query)
+    )
+    if category is not None:
+        query = query.where(ProjectModel.category == category)
+    if active is not None:
+        query = query.where(ProjectModel.is_active == active)
+    if after is not None:
+        query = query.where(keyset_after(rank, ProjectModel.id, True, *after))
+    return query.order_by(*keyset_order(rank, ProjectModel.id, True)).limit(limit + 1)
+
+
+async def search_projects(db, q: str, category, active, cursor: str | None, limit: int):
+    after = decode_cursor(cursor, "search") if cursor else None
+    rows = (await db.execute(search_query(q, category, active, after, limit))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor("search", rows[-1].rank, str(rows[-1].id))
+    return [summary_row(row) for row in rows], next_cursor
+
+
+def _feed_branch(model, kind: str, title, project_id, after, limit: int):
+    query = select(
+        literal(kind).label("kind"),
+        model.id,
+        title.label("title"),
+        model.content,
+        model.date,
+        model.author_id,
+        model.author_name,
+        model.author_avatar,
+    ).where(model.project_id == project_id)
+    if after is not None:
+        query = query.where(keyset_after(model.date, model.id, True, *after))
+    return query.order_by(*keyset_order(model.date, model.id, True)).limit(limit)
+
+
+def feed_query(project_id, after, limit: int):
+    feed = union_all(
+        _feed_branch(ProjectComment, "comment", literal(None, String), project_id, after, limit + 1),
+        _feed_branch(ProjectUpdate, "update", ProjectUpdate.title, project_id, after, limit + 1),
+    ).subquery()
+    return select(feed).order_by(feed.c.date.desc(), feed.c.id.desc()).limit(limit + 1)
+
+
+async def list_feed(db, project_id, cursor: str | None, limit: int):
+    after = decode_cursor(cursor, "feed") if cursor else None
+    rows = (await db.execute(feed_query(project_id, after, limit))).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor("feed", rows[-1]["date"], str(rows[-1]["id"]))
+    return [dict(row) for row in rows], next_cursor
@@ -0,0 +1,116 @@
+"""Explicit schema creation and upgrade: ``python -m app.schema``.
+
+The API no longer creates tables on import; run this once per database
+or set DB_CREATE_SCHEMA=true to do it in the application lifespan.
+
+``create_all`` only creates tables that do not exist yet, so databases
+created by an older release are also upgraded in place: missing columns,
+indexes and unique constraints are added, retired indexes dropped and the
+new columns backfilled. Every step checks the live schema first, so running
+it again is a no-op. After upgrading such a database, rebuild the
+achievement counters with ``python -m app.achievements.replay``.
+"""
+import asyncio
+from sqlalchemy import UniqueConstraint, inspect, text
+from sqlalchemy.schema import AddConstraint, CreateColumn
+from . import models
+from .database import async_engine
+from .users.wallet import IMPACT_FACTORS
+
+# Superseded by ix_verification_codes_lookup, which leads with email.
+RETIRED_INDEXES = ("ix_verification_codes_email", "ix_verification_codes_code")
+
+def _impact(factor: str) -> str:
+    """SQL for the IMPACT_FACTORS entry of a transaction's project category."""
+    cases = " ".join(
+        f"WHEN '{category}' THEN {factors[factor]}" for category, factors in IMPACT_FACTORS.items()
+    )
+    return f"CASE projects.category {cases} ELSE {IMPACT_FACTORS['social'][factor]} END"
+
+
+BACKFILL = (
+    # Rows from before background moderation were moderated on creation; the
+    # rejected ones were stored inactive and without scores.
+    """
+    UPDATE projects SET moderation_status = CASE
+        WHEN is_active OR esg_e + esg_s + esg_g > 0 THEN 'approved' ELSE 'review'
+    END
+    WHERE moderation_status IS NULL
+    """,
+    "UPDATE projects SET version = nextval('catalog_version_seq') WHERE version IS NULL",
+    "UPDATE projects SET updated_at = created_at WHERE updated_at IS NULL",
+    # The baseline kept no wallet for most donors; rebuild every wallet that
+    # predates the donation totals from completed transactions.
+    f"""
+    INSERT INTO eco_wallets (
+        user_id, co2_saved, trees_planted, tree_progress, water_saved, total_donated, donations_count
+    )
+    SELECT user_id, co2, floor(trees)::integer, trees - floor(trees), water, total, count
+    FROM (
+        SELECT transactions.user_id,
+            sum(transactions.amount * {_impact("co2_saved")}) AS co2,
+            sum(transactions.amount * {_impact("trees")}) AS trees,
+            sum(transactions.amount * {_impact("water_saved")}) AS water,
+            sum(transactions.amount) AS total,
+            count(*) AS count
+        FROM transactions LEFT JOIN projects ON projects.id = transactions.project_id
+        WHERE transactions.status = 'completed' AND transactions.user_id IS NOT NULL
+        GROUP BY transactions.user_id
+    ) AS totals
+    ON CONFLICT (user_id) DO UPDATE SET
+        co2_saved = excluded.co2_saved,
+        trees_planted = excluded.trees_planted,
+        tree_progress = excluded.tree_progress,
+        water_saved = excluded.water_saved,
+        total_donated = excluded.total_donated,
+        donations_count = excluded.donations_count
+    WHERE eco_wallets.total_donated IS NULL
+    """,
+    """
+    UPDATE eco_wallets SET
+        tree_progress = coalesce(tree_progress, 0),
+        total_donated = coalesce(total_donated, 0),
+        donations_count = coalesce(donations_count, 0)
+    WHERE tree_progress IS NULL OR total_donated IS NULL OR donations_count IS NULL
+    """,
+)
+
+
+def upgrade(connection):
+    inspector = inspect(connection)
+    for table in models.Base.metadata.sorted_tables:
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                definition = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
+
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(connection)
+
+        constraints = {constraint["name"] for constraint in inspector.get_unique_constraints(table.name)}
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.name and constraint.name not in constraints:
+                connection.execute(AddConstraint(constraint))
+
+    for name in RETIRED_INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    for statement in BACKFILL:
+        connection.execute(text(statement))
+
+
+async def create_schema():
+    async with async_engine.begin() as connection:
+        await connection.run_sync(models.Base.metadata.create_all)
+        await connection.run_sync(upgrade)
+
+
+async def _main():
+    await create_schema()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -27,6 +27,20 @@ class CommentResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class FeedItem(BaseModel):
+    kind: Literal['comment', 'update']
+    id: UUID
+    title: Optional[str] = None
+    content: str
+    date: datetime
+    author_id: Optional[UUID] = None
+    author_name: Optional[str] = None
+    author_avatar: Optional[str] = None
+
+class FeedResponse(BaseModel):
+    items: List[FeedItem]
+    next_cursor: Optional[str] = None
+
 class UserRegister(BaseModel):
     name: str = Field(..., min_length=2)
     email: EmailStr
@@ -41,11 +55,30 @@ class VerifyEmailRequest(BaseModel):
 
 class TransactionCreate(BaseModel):
     project_id: UUID
-    amount: Decimal
+    amount: Decimal = Field(..., gt=0)
 
     class Config:
         orm_mode = True
 
+class BulkDonationItem(BaseModel):
+    user_id: UUID
+    project_id: UUID
+    amount: Decimal
+
+class BulkDonationRequest(BaseModel):
+    items: List[BulkDonationItem] = Field(..., min_length=1, max_length=5000)
+
+class BulkDonationResult(BaseModel):
+    index: int
+    status: Literal['accepted', 'rejected']
+    transaction_id: Optional[UUID] = None
+    reason: Optional[str] = None
+
+class BulkDonationResponse(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[BulkDonationResult]
+
 class TransactionResponse(BaseModel):
     id: UUID
     user_id: UUID
@@ -69,6 +102,12 @@ class TwoFARequest(BaseModel):
 class PasswordResetRequest(BaseModel):
     new_password: str = Field(..., min_length=8)
 
+class TokenClaims(BaseModel):
+    id: UUID
+    email: EmailStr
+    name: str
+    role: str
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
@@ -157,3 +196,95 @@ class Project(ProjectBase):
 
 class ProjectListResponse(BaseModel):
     projects: List[Project]
+    next_cursor: Optional[str] = None
+
+class ProjectSummary(BaseModel):
+    id: UUID
+    title: str
+    description: str
+    category: Literal['ecology', 'social', 'governance']
+    image: Optional[str] = None
+    current_amount: float = 0
+    target_amount: float
+    days_left: int
+    backers: int = 0
+    esg_rating: ESGRating
+    created_at: datetime
+    end_date: datetime
+    creator_id: UUID
+    creator_name: str
+    creator_avatar: Optional[str] = None
+
+class EcoWalletResponse(BaseModel):
+    co2_saved: float = 0
+    trees_planted: int = 0
+    water_saved: float = 0
+    total_donated: float = 0
+    donations_count: int = 0
+
+class DashboardTransaction(BaseModel):
+    id: UUID
+    project_id: Optional[UUID] = None
+    project_title: Optional[str] = None
+    amount: Decimal
+    date: datetime
+    status: str
+
+class AchievementResponse(BaseModel):
+    id: UUID
+    title: str
+    description: Optional[str] = None
+    icon: Optional[str] = None
+    earned_at: datetime
+
+class DashboardResponse(BaseModel):
+    wallet: EcoWalletResponse
+    backed_projects: List[ProjectSummary]
+    recent_transactions: List[DashboardTransaction]
+    achievements: List[AchievementResponse]
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    id: UUID
+    name: Optional[str] = None
+    category: Optional[Literal['ecology', 'social', 'governance']] = None
+    score: float
+
+class LeaderboardResponse(BaseModel):
+    kind: Literal['top_funded', 'most_backers', 'best_esg', 'top_donors_month']
+    month: Optional[str] = None
+    entries: List[LeaderboardEntry]
+    rebuilt_at: Optional[datetime] = None
+
+class ProjectSummaryListResponse(BaseModel):
+    projects: List[ProjectSummary]
+    next_cursor: Optional[str] = None
+
+class ProjectFilters(BaseModel):
+    category: Optional[Literal['ecology', 'social', 'governance']] = None
+    esg_e_min: Optional[int] = Field(None, ge=0, le=5)
+    esg_e_max: Optional[int] = Field(None, ge=0, le=5)
+    esg_s_min: Optional[int] = Field(None, ge=0, le=5)
+    esg_s_max: Optional[int] = Field(None, ge=0, le=5)
+    esg_g_min: Optional[int] = Field(None, ge=0, le=5)
+    esg_g_max: Optional[int] = Field(None, ge=0, le=5)
+    funded_min: Optional[float] = Field(None, ge=0)
+    funded_max: Optional[float] = Field(None, ge=0)
+    deadline_after: Optional[datetime] = None
+    deadline_before: Optional[datetime] = None
+    sort: Literal['newest', 'most_funded', 'ending_soon'] = 'newest'
+    cursor: Optional[str] = None
+    limit: int = Field(100, ge=1, le=100)
+
+    @field_validator('deadline_after', 'deadline_before')
+    def validate_deadline(cls, v):
+        if v is not None and v.tzinfo is not None:
+            return v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
+
+class ModerationStatusResponse(BaseModel):
+    project_id: UUID
+    status: Literal['pending', 'approved', 'rejected', 'review', 'provisional', 'failed']
+    is_active: bool
+    esg_rating: ESGRating
+    reason: Optional[str] = None
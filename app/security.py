@@ -3,44 +3,92 @@ from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Annotated
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import time
+from .cache import TTLCache
 from .models import User
 from .database import get_db
-import os
-from dotenv import load_dotenv
+from .schemas import TokenClaims
+from .config import settings
 
-load_dotenv()
+SECRET_KEY = settings.jwt_secret_key
+ALGORITHM = settings.jwt_algorithm
 
-SECRET_KEY = os.getenv("JWT_SECRET_KEY")
-ALGORITHM = os.getenv("JWT_ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", 360))
+_claims_cache = TTLCache(settings.auth_cache_size, settings.auth_cache_ttl)
+_user_cache = TTLCache(settings.auth_cache_size, settings.auth_cache_ttl)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.utcnow() + timedelta(minutes=settings.jwt_access_token_expire_minutes)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def invalidate_user(email: str):
+    _user_cache.pop(email)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    invalidate_user(target.email)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("email")
-        if email is None:
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def decode_token(token: str) -> dict:
+    payload = _claims_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
             raise credentials_exception
-    except JWTError:
+        if payload.get("email") is None:
+            raise credentials_exception
+        ttl = min(settings.auth_cache_ttl, payload.get("exp", 0) - time.time())
+        if ttl > 0:
+            _claims_cache.set(token, payload, ttl)
+    elif payload.get("exp", 0) < time.time():
+        _claims_cache.pop(token)
         raise credentials_exception
+    return payload
 
-    user = db.query(User).filter(User.email == email).first()
+async def load_user(email: str, db: AsyncSession) -> User:
+    user = _user_cache.get(email)
     if user is None:
-        raise credentials_exception
+        user = await db.scalar(select(User).where(User.email == email))
+        if user is None:
+            raise credentials_exception
+        db.expunge(user)
+        _user_cache.set(email, user)
     return user
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    payload = decode_token(token)
+    return await load_user(payload["email"], db)
+
+# Claims are read from the token and live as long as it does, so a changed role
+# or a deleted user goes unnoticed; role checks and writes use get_current_user.
+async def get_current_claims(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_db)
+) -> TokenClaims:
+    payload = decode_token(token)
+    if payload.get("id") and payload.get("name"):
+        return TokenClaims(
+            id=payload["id"],
+            email=payload["email"],
+            name=payload["name"],
+            role=payload.get("role", "user")
+        )
+
+    user = await load_user(payload["email"], db)
+    return TokenClaims(id=user.id, email=user.email, name=user.name, role=user.role)
@@ -1,44 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from uuid import UUID
-from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
-from app.models import Project as ProjectModel, User, Transaction
-from app.security import get_current_user
-import uuid
-from app.schemas import TransactionCreate, TransactionResponse
+from app.schemas import TransactionCreate, BulkDonationRequest, BulkDonationResponse
 from ..database import get_db
+from app.models import User
 from app.security import get_current_user
+from app.projects.live import hub, funding_state
+from app.leaderboards.service import leaderboards, record_donations
+from .service import apply_donation, apply_bulk_donations
 router = APIRouter(prefix="/transactions", tags=["transaction"])
 
 @router.post("/new_transaction/")
 async def create_transaction(
-    transaction_data: TransactionCreate, db: Session = Depends(get_db),
+    transaction_data: TransactionCreate, db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    project = db.query(ProjectModel).filter(ProjectModel.id == transaction_data.project_id).first()
-    if not project:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-
-
-    project.current_amount = Decimal(str(project.current_amount)) if isinstance(project.current_amount, float) else project.current_amount
-
-    transaction_amount = Decimal(str(transaction_data.amount))
-
-    project.current_amount += transaction_amount
-
     transaction_amount = Decimal(str(transaction_data.amount))
-    transaction = Transaction(
-        id=UUID(int=uuid.uuid4().int),
-        user_id=user.id,
-        project_id=transaction_data.project_id,
-        project_title=project.title,
-        amount=transaction_amount,
-        status="completed",
-    )
+    funded = await apply_donation(db, user.id, transaction_data.project_id, transaction_amount)
+    if funded is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
 
-    db.add(transaction)
-    db.commit()
-    db.commit()
+    await hub.publish(funding_state(
+        transaction_data.project_id, funded.current_amount, funded.target_amount, funded.backers
+    ))
+    leaderboards.donation(user.id, transaction_amount, user.name)
 
     return {"message": "Transaction successfully created and project updated"}
+
+@router.post("/bulk", response_model=BulkDonationResponse)
+async def create_transactions_bulk(
+    batch: BulkDonationRequest, db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    if user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not admin")
+
+    results, funded = await apply_bulk_donations(db, batch.items)
+    await record_donations(db, [
+        (batch.items[result.index].user_id, batch.items[result.index].amount)
+        for result in results if result.status == "accepted"
+    ])
+    for project in funded:
+        await hub.publish(funding_state(
+            project.id, project.current_amount, project.target_amount, project.backers
+        ))
+
+    accepted = sum(result.status == "accepted" for result in results)
+    return BulkDonationResponse(accepted=accepted, rejected=len(results) - accepted, results=results)
@@ -0,0 +1,155 @@
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import bindparam, exists, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert, UUID
+from app.database import row_batches
+from app.models import BackedProject, Project as ProjectModel, Transaction, User
+from app.schemas import BulkDonationItem, BulkDonationResult
+from app.users.wallet import credit_wallets
+from app.achievements import engine as achievements
+from app.events import DonationCompleted
+
+
+def funding_statement(user_id, project_id, amount: Decimal):
+    new_backer = (
+        insert(BackedProject)
+        .from_select(
+            ["user_id", "project_id"],
+            select(
+                literal(user_id, UUID(as_uuid=True)),
+                literal(project_id, UUID(as_uuid=True))
+            ).where(exists().where(ProjectModel.id == project_id))
+        )
+        .on_conflict_do_nothing()
+        .returning(BackedProject.user_id)
+        .cte("new_backer")
+    )
+    added_backers = select(func.count()).select_from(new_backer).scalar_subquery()
+    return (
+        update(ProjectModel)
+        .add_cte(new_backer)
+        .where(ProjectModel.id == project_id)
+        .values(
+            current_amount=ProjectModel.current_amount + float(amount),
+            backers=ProjectModel.backers + added_backers
+        )
+        .returning(
+            ProjectModel.title, ProjectModel.category, ProjectModel.current_amount,
+            ProjectModel.target_amount, ProjectModel.backers, added_backers.label("new_backer")
+        )
+    )
+
+
+async def apply_donation(db, user_id, project_id, amount: Decimal):
+    funded = (await db.execute(funding_statement(user_id, project_id, amount))).first()
+    if funded is None:
+        await db.rollback()
+        return None
+
+    transaction = Transaction(
+        user_id=user_id,
+        project_id=project_id,
+        project_title=funded.title,
+        amount=amount,
+        status="completed",
+    )
+    db.add(transaction)
+    await credit_wallets(db, [(user_id, funded.category, amount)])
+    await achievements.record(db, [DonationCompleted(user_id, project_id, amount, bool(funded.new_backer))])
+    await db.commit()
+    return funded
+
+
+bulk_funding_statement = (
+    update(ProjectModel.__table__)
+    .where(ProjectModel.id == bindparam("project"))
+    .values(
+        current_amount=ProjectModel.current_amount + bindparam("total"),
+        backers=ProjectModel.backers + bindparam("new_backers")
+    )
+)
+
+
+async def apply_bulk_donations(db, items: list[BulkDonationItem]):
+    project_ids = {item.project_id for item in items}
+    user_ids = {item.user_id for item in items}
+    projects = {
+        row.id: row for row in await db.execute(
+            select(ProjectModel.id, ProjectModel.title, ProjectModel.category)
+            .where(ProjectModel.id.in_(project_ids))
+        )
+    }
+    known_users = set(await db.scalars(select(User.id).where(User.id.in_(user_ids))))
+
+    results, rows = [], []
+    totals = defaultdict(float)
+    for index, item in enumerate(items):
+        if item.amount <= 0:
+            reason = "Amount must be positive"
+        elif item.project_id not in projects:
+            reason = "Project not found"
+        elif item.user_id not in known_users:
+            reason = "User not found"
+        else:
+            reason = None
+        if reason:
+            results.append(BulkDonationResult(index=index, status="rejected", reason=reason))
+            continue
+
+        transaction_id = uuid.uuid4()
+        rows.append({
+            "id": transaction_id,
+            "user_id": item.user_id,
+            "project_id": item.project_id,
+            "project_title": projects[item.project_id].title,
+            "amount": item.amount,
+            "status": "completed",
+        })
+        totals[item.project_id] += float(item.amount)
+        results.append(BulkDonationResult(index=index, status="accepted", transaction_id=transaction_id))
+
+    if not rows:
+        return results, []
+
+    # Multi-row statements go through row_batches to stay under the bind parameter limit.
+    pairs = sorted({(row["user_id"], row["project_id"]) for row in rows})
+    new_pairs = set()
+    for batch in row_batches(BackedProject.__table__, [
+        {"user_id": user_id, "project_id": project_id} for user_id, project_id in pairs
+    ]):
+        new_pairs.update((await db.execute(
+            insert(BackedProject)
+            .values(batch)
+            .on_conflict_do_nothing()
+            .returning(BackedProject.user_id, BackedProject.project_id)
+        )).tuples())
+    new_backers = defaultdict(int)
+    for _, project_id in new_pairs:
+        new_backers[project_id] += 1
+
+    for batch in row_batches(Transaction.__table__, rows):
+        await db.execute(insert(Transaction).values(batch))
+    # Projects are updated in id order so concurrent batches lock rows in the same order.
+    await db.execute(bulk_funding_statement, [
+        {"project": project_id, "total": total, "new_backers": new_backers[project_id]}
+        for project_id, total in sorted(totals.items())
+    ])
+    # Wallets are credited after the project rows, matching apply_donation's lock order.
+    await credit_wallets(db, [
+        (row["user_id"], projects[row["project_id"]].category, row["amount"]) for row in rows
+    ])
+    events = []
+    for row in rows:
+        pair = (row["user_id"], row["project_id"])
+        events.append(DonationCompleted(*pair, row["amount"], pair in new_pairs))
+        new_pairs.discard(pair)
+    await achievements.record(db, events)
+    funded = (await db.execute(
+        select(
+            ProjectModel.id, ProjectModel.current_amount,
+            ProjectModel.target_amount, ProjectModel.backers
+        ).where(ProjectModel.id.in_(totals))
+    )).all()
+    await db.commit()
+    return results, funded
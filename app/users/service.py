@@ -0,0 +1,56 @@
+from sqlalchemy import select
+from app.models import Achievement, BackedProject, EcoWallet, Project as ProjectModel, Transaction
+from app.projects.service import SUMMARY_COLUMNS, summary_row
+
+DASHBOARD_PROJECTS = 20
+DASHBOARD_TRANSACTIONS = 10
+DASHBOARD_ACHIEVEMENTS = 20
+
+
+def wallet_dict(wallet: EcoWallet | None) -> dict:
+    if wallet is None:
+        return {"co2_saved": 0, "trees_planted": 0, "water_saved": 0, "total_donated": 0, "donations_count": 0}
+    return {
+        "co2_saved": float(wallet.co2_saved or 0),
+        "trees_planted": wallet.trees_planted or 0,
+        "water_saved": float(wallet.water_saved or 0),
+        "total_donated": float(wallet.total_donated or 0),
+        "donations_count": wallet.donations_count or 0,
+    }
+
+
+async def load_dashboard(db, user_id) -> dict:
+    # Four indexed reads; wallet totals are maintained by the donation path.
+    wallet = await db.get(EcoWallet, user_id)
+    projects = await db.execute(
+        select(*SUMMARY_COLUMNS)
+        .join(BackedProject, BackedProject.project_id == ProjectModel.id)
+        .where(BackedProject.user_id == user_id)
+        .order_by(ProjectModel.created_at.desc(), ProjectModel.id.desc())
+        .limit(DASHBOARD_PROJECTS)
+    )
+    transactions = await db.execute(
+        select(
+            Transaction.id, Transaction.project_id, Transaction.project_title,
+            Transaction.amount, Transaction.date, Transaction.status
+        )
+        .where(Transaction.user_id == user_id)
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(DASHBOARD_TRANSACTIONS)
+    )
+    achievements = await db.execute(
+        select(
+            Achievement.id, Achievement.title, Achievement.description,
+            Achievement.icon, Achievement.earned_at
+        )
+        .where(Achievement.user_id == user_id)
+        .order_by(Achievement.earned_at.desc())
+        .limit(DASHBOARD_ACHIEVEMENTS)
+    )
+    return {
+        "wallet": wallet_dict(wallet),
+        "backed_projects": [summary_row(row) for row in projects],
+        # orjson does not encode Decimal, so Numeric amounts are sent as floats.
+        "recent_transactions": [{**row._asdict(), "amount": float(row.amount)} for row in transactions],
+        "achievements": [row._asdict() for row in achievements],
+    }
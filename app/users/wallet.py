@@ -0,0 +1,65 @@
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.dialects.postgresql import insert
+from app.database import row_batches
+from app.models import EcoWallet
+
+# Impact credited per donated ruble: kg of CO2, trees and litres of water.
+IMPACT_FACTORS = {
+    "ecology": {"co2_saved": Decimal("0.02"), "trees": Decimal("0.002"), "water_saved": Decimal("0.5")},
+    "social": {"co2_saved": Decimal("0.005"), "trees": Decimal("0"), "water_saved": Decimal("0.1")},
+    "governance": {"co2_saved": Decimal("0.002"), "trees": Decimal("0"), "water_saved": Decimal("0.05")},
+}
+
+
+def wallet_rows(donations) -> list[dict]:
+    """Sums (user_id, category, amount) donations into one wallet delta per user."""
+    deltas = defaultdict(lambda: defaultdict(Decimal))
+    for user_id, category, amount in donations:
+        factors = IMPACT_FACTORS.get(category, IMPACT_FACTORS["social"])
+        delta = deltas[user_id]
+        delta["co2_saved"] += amount * factors["co2_saved"]
+        delta["trees"] += amount * factors["trees"]
+        delta["water_saved"] += amount * factors["water_saved"]
+        delta["total_donated"] += amount
+        delta["donations_count"] += 1
+
+    return [
+        {
+            "user_id": user_id,
+            "co2_saved": delta["co2_saved"],
+            "trees_planted": int(delta["trees"]),
+            "tree_progress": delta["trees"] % 1,
+            "water_saved": delta["water_saved"],
+            "total_donated": delta["total_donated"],
+            "donations_count": int(delta["donations_count"]),
+        }
+        for user_id, delta in sorted(deltas.items())
+    ]
+
+
+def wallet_statement(rows: list[dict]):
+    statement = insert(EcoWallet).values(rows)
+    added = statement.excluded
+    progress = func.coalesce(EcoWallet.tree_progress, 0) + added.tree_progress
+    return statement.on_conflict_do_update(
+        index_elements=[EcoWallet.user_id],
+        set_={
+            "co2_saved": func.coalesce(EcoWallet.co2_saved, 0) + added.co2_saved,
+            "water_saved": func.coalesce(EcoWallet.water_saved, 0) + added.water_saved,
+            "trees_planted": (
+                func.coalesce(EcoWallet.trees_planted, 0) + added.trees_planted
+                + cast(func.floor(progress), Integer)
+            ),
+            "tree_progress": progress - func.floor(progress),
+            "total_donated": func.coalesce(EcoWallet.total_donated, 0) + added.total_donated,
+            "donations_count": func.coalesce(EcoWallet.donations_count, 0) + added.donations_count,
+        }
+    )
+
+
+async def credit_wallets(db, donations):
+    # Rows stay sorted by user across batches, so wallet locks are still taken in order.
+    for batch in row_batches(EcoWallet.__table__, wallet_rows(donations)):
+        await db.execute(wallet_statement(batch))
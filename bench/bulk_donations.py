@@ -0,0 +1,134 @@
+"""Bulk versus per-call donation benchmark.
+
+Replays the same settlement batch twice against throwaway projects: once
+one donation at a time through apply_donation, as the provider replay
+does today, and once through apply_bulk_donations:
+
+    python -m bench.bulk_donations --donors 200 --projects 20 --donations 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import delete, func, select, update
+from app.database import AsyncSessionLocal, async_engine
+from app.models import BackedProject, Project, Transaction, User
+from app.schemas import BulkDonationItem
+from app.transaction.service import apply_bulk_donations, apply_donation
+
+
+async def setup(donors: int, projects: int):
+    async with AsyncSessionLocal() as db:
+        users = [
+            User(name="bench", email=f"bench-{uuid.uuid4()}@example.com", password_hash="-")
+            for _ in range(donors)
+        ]
+        targets = [
+            Project(
+                title=f"bench {i}", description="bulk donation benchmark", category="social",
+                target_amount=1_000_000, end_date=datetime.utcnow() + timedelta(days=1),
+                current_amount=0, backers=0, is_active=True
+            )
+            for i in range(projects)
+        ]
+        db.add_all([*users, *targets])
+        await db.commit()
+        return [user.id for user in users], [project.id for project in targets]
+
+
+async def reset(project_ids):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Transaction).where(Transaction.project_id.in_(project_ids)))
+        await db.execute(delete(BackedProject).where(BackedProject.project_id.in_(project_ids)))
+        await db.execute(
+            update(Project).where(Project.id.in_(project_ids)).values(current_amount=0, backers=0)
+        )
+        await db.commit()
+
+
+async def teardown(user_ids, project_ids):
+    await reset(project_ids)
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Project).where(Project.id.in_(project_ids)))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.commit()
+
+
+async def totals(project_ids):
+    async with AsyncSessionLocal() as db:
+        amount, backers = (await db.execute(
+            select(func.sum(Project.current_amount), func.sum(Project.backers)).where(Project.id.in_(project_ids))
+        )).one()
+        transactions = await db.scalar(
+            select(func.count()).select_from(Transaction).where(Transaction.project_id.in_(project_ids))
+        )
+    return {"current_amount": round(amount, 2), "backers": backers, "transactions": transactions}
+
+
+async def per_call(items):
+    for item in items:
+        async with AsyncSessionLocal() as db:
+            await apply_donation(db, item.user_id, item.project_id, item.amount)
+
+
+async def bulk(items, batch_size: int):
+    for offset in range(0, len(items), batch_size):
+        async with AsyncSessionLocal() as db:
+            await apply_bulk_donations(db, items[offset:offset + batch_size])
+
+
+async def measure(name, coro, project_ids):
+    started = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - started
+    return {"path": name, "seconds": round(elapsed, 3), **await totals(project_ids)}
+
+
+async def run(args):
+    user_ids, project_ids = await setup(args.donors, args.projects)
+    rng = random.Random(args.seed)
+    items = [
+        BulkDonationItem(
+            user_id=rng.choice(user_ids), project_id=rng.choice(project_ids),
+            amount=Decimal(rng.choice(["50", "100", "250", "500"]))
+        )
+        for _ in range(args.donations)
+    ]
+    try:
+        runs = [await measure("per_call", per_call(items), project_ids)]
+        await reset(project_ids)
+        runs.append(await measure("bulk", bulk(items, args.batch_size), project_ids))
+    finally:
+        await teardown(user_ids, project_ids)
+        await async_engine.dispose()
+
+    for result in runs:
+        result["donations_per_second"] = round(len(items) / result["seconds"], 1)
+    per_call_run, bulk_run = runs
+    return {
+        "donations": len(items),
+        "batch_size": args.batch_size,
+        "runs": runs,
+        "speedup": round(per_call_run["seconds"] / bulk_run["seconds"], 1),
+        "consistent": all(per_call_run[key] == bulk_run[key] for key in ("current_amount", "backers", "transactions")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--donors", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--donations", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
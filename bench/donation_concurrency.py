@@ -0,0 +1,97 @@
+"""Concurrent donation benchmark.
+
+Creates a throwaway project and donors, fires donations concurrently
+and checks that no update was lost:
+
+    python -m bench.donation_concurrency --donors 50 --donations 20 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import delete, func, select
+from app.database import AsyncSessionLocal, async_engine
+from app.models import BackedProject, Project, Transaction, User
+from app.transaction.service import apply_donation
+
+
+async def setup(donors: int):
+    async with AsyncSessionLocal() as db:
+        users = [
+            User(name="bench", email=f"bench-{uuid.uuid4()}@example.com", password_hash="-")
+            for _ in range(donors)
+        ]
+        project = Project(
+            title="bench", description="concurrency benchmark", category="social",
+            target_amount=1_000_000, end_date=datetime.utcnow() + timedelta(days=1),
+            current_amount=0, backers=0, is_active=True
+        )
+        db.add_all([*users, project])
+        await db.commit()
+        return [user.id for user in users], project.id
+
+
+async def teardown(user_ids, project_id):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Transaction).where(Transaction.project_id == project_id))
+        await db.execute(delete(BackedProject).where(BackedProject.project_id == project_id))
+        await db.execute(delete(Project).where(Project.id == project_id))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.commit()
+
+
+async def donate(slots, user_id, project_id, amount):
+    async with slots:
+        async with AsyncSessionLocal() as db:
+            await apply_donation(db, user_id, project_id, amount)
+
+
+async def run(args):
+    user_ids, project_id = await setup(args.donors)
+    jobs = [user_id for user_id in user_ids for _ in range(args.donations)]
+    slots = asyncio.Semaphore(args.concurrency)
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*[donate(slots, user_id, project_id, args.amount) for user_id in jobs])
+        elapsed = time.perf_counter() - started
+
+        async with AsyncSessionLocal() as db:
+            project = await db.get(Project, project_id)
+            transactions = await db.scalar(
+                select(func.count()).select_from(Transaction).where(Transaction.project_id == project_id)
+            )
+    finally:
+        await teardown(user_ids, project_id)
+        await async_engine.dispose()
+
+    expected_amount = float(args.amount * len(jobs))
+    return {
+        "donations": len(jobs),
+        "concurrency": args.concurrency,
+        "seconds": round(elapsed, 3),
+        "donations_per_second": round(len(jobs) / elapsed, 1),
+        "expected_amount": expected_amount,
+        "current_amount": project.current_amount,
+        "expected_backers": args.donors,
+        "backers": project.backers,
+        "transactions": transactions,
+        "lost_updates": round((expected_amount - project.current_amount) / float(args.amount)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--donors", type=int, default=50)
+    parser.add_argument("--donations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--amount", type=Decimal, default=Decimal("1.5"))
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""HTTP load benchmark.
+
+Starts the fake Ollama server and the SMTP sink from ``bench.stubs``,
+launches the app under uvicorn against the local Postgres configured in
+``.env`` and drives a weighted mix of auth, project, donation and comment
+traffic:
+
+    python -m bench.load --users 20 --projects 10 --duration 30 --concurrency 32 --output load.json
+
+The report is JSON with sorted keys so two runs can be diffed directly.
+It holds req/s and p50/p95/p99 per scenario, and SQL statements per
+request per route as counted by the app's own /metrics endpoint.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+from .stubs import FakeOllama, SMTPSink, add_stub_arguments
+
+DEFAULT_MIX = (
+    "list_projects=30,get_project=20,search=8,feed=5,"
+    "donate=15,comment=10,login=7,create_project=5"
+)
+SEARCH_TERMS = ["деревья", "парк", "школа", "вода", "приют", "велодорожка"]
+PASSWORD = "bench-password"
+
+
+@dataclass
+class BenchUser:
+    email: str
+    token: str = ""
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError as exc:
+            response, status = None, type(exc).__name__
+        self.latencies[name].append(time.perf_counter() - started)
+        self.statuses[name][status] += 1
+        return response
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    sink: SMTPSink
+    recorder: Recorder
+    users: list[BenchUser]
+    project_ids: list[str]
+
+
+def ok(response) -> bool:
+    return response is not None and response.status_code < 400
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(latencies: list[float], statuses: Counter, seconds: float) -> dict:
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2),
+        },
+        "status": dict(statuses),
+    }
+
+
+async def sign_in(ctx: Context, user: BenchUser, recorder: Recorder):
+    async with user.lock:
+        ctx.sink.clear(user.email)
+        response = await recorder.request(
+            ctx.client, "auth_login", "POST", "/auth/login", json={"email": user.email, "password": PASSWORD}
+        )
+        if not ok(response):
+            return
+        code = await ctx.sink.wait_for_code(user.email)
+        response = await recorder.request(
+            ctx.client, "auth_2fa", "POST", "/auth/2fa", json={"email": user.email, "code": code}
+        )
+        if ok(response):
+            user.token = response.json()["access_token"]
+
+
+async def register(ctx: Context, user: BenchUser):
+    payload = {"name": "Bench User", "email": user.email, "password": PASSWORD}
+    response = await ctx.recorder.request(ctx.client, "auth_register", "POST", "/auth/register", json=payload)
+    if not ok(response):
+        raise RuntimeError(f"register failed for {user.email}: {response and response.text}")
+    code = await ctx.sink.wait_for_code(user.email)
+    await ctx.recorder.request(
+        ctx.client, "auth_verify_email", "POST", "/auth/register-verify-email",
+        json={"email": user.email, "confirm_code": code}
+    )
+    await sign_in(ctx, user, ctx.recorder)
+
+
+def project_payload(index: int) -> dict:
+    term = SEARCH_TERMS[index % len(SEARCH_TERMS)]
+    return {
+        "title": f"Бенчмарк: {term} #{index}",
+        "description": f"Нагрузочный проект про {term}",
+        "full_description": f"Проект создан нагрузочным тестом, тема: {term}. " * 5,
+        "category": random.choice(["ecology", "social", "governance"]),
+        "target_amount": 100000,
+        "end_date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + 30 * 86400)),
+    }
+
+
+async def create_project(ctx: Context, user: BenchUser, index: int, recorder: Recorder):
+    response = await recorder.request(
+        ctx.client, "create_project", "POST", "/projects/", json=project_payload(index), headers=user.headers
+    )
+    return response.json()["id"] if ok(response) else None
+
+
+async def wait_for_moderation(ctx: Context, owners: dict[str, BenchUser], timeout: float) -> dict:
+    deadline = time.monotonic() + timeout
+    statuses = {}
+    pending = set(owners)
+    while pending and time.monotonic() < deadline:
+        for project_id in list(pending):
+            response = await ctx.client.get(
+                f"/projects/{project_id}/moderation", headers=owners[project_id].headers
+            )
+            if ok(response) and response.json()["status"] != "pending":
+                statuses[project_id] = response.json()["status"]
+                pending.discard(project_id)
+        if pending:
+            await asyncio.sleep(0.2)
+    return dict(Counter(statuses.values()), pending=len(pending))
+
+
+async def scenario_list_projects(ctx: Context, rng: random.Random):
+    sort = rng.choice(["newest", "most_funded", "ending_soon"])
+    await ctx.recorder.request(ctx.client, "list_projects", "GET", "/projects/", params={"sort": sort, "limit": 20})
+
+
+async def scenario_get_project(ctx: Context, rng: random.Random):
+    await ctx.recorder.request(ctx.client, "get_project", "GET", f"/projects/{rng.choice(ctx.project_ids)}")
+
+
+async def scenario_search(ctx: Context, rng: random.Random):
+    await ctx.recorder.request(
+        ctx.client, "search", "GET", "/projects/search", params={"q": rng.choice(SEARCH_TERMS)}
+    )
+
+
+async def scenario_feed(ctx: Context, rng: random.Random):
+    await ctx.recorder.request(ctx.client, "feed", "GET", f"/projects/{rng.choice(ctx.project_ids)}/feed")
+
+
+async def scenario_donate(ctx: Context, rng: random.Random):
+    payload = {"project_id": rng.choice(ctx.project_ids), "amount": rng.choice([50, 100, 250, 500])}
+    await ctx.recorder.request(
+        ctx.client, "donate", "POST", "/transactions/new_transaction/",
+        json=payload, headers=rng.choice(ctx.users).headers
+    )
+
+
+async def scenario_comment(ctx: Context, rng: random.Random):
+    payload = {"project_id": rng.choice(ctx.project_ids), "content": "Отличный проект, поддерживаю!"}
+    await ctx.recorder.request(
+        ctx.client, "comment", "POST", "/comments/new_comment", json=payload, headers=rng.choice(ctx.users).headers
+    )
+
+
+async def scenario_login(ctx: Context, rng: random.Random):
+    await sign_in(ctx, rng.choice(ctx.users), ctx.recorder)
+
+
+async def scenario_create_project(ctx: Context, rng: random.Random):
+    await create_project(ctx, rng.choice(ctx.users), rng.randrange(1_000_000), ctx.recorder)
+
+
+SCENARIOS = {
+    "list_projects": scenario_list_projects,
+    "get_project": scenario_get_project,
+    "search": scenario_search,
+    "feed": scenario_feed,
+    "donate": scenario_donate,
+    "comment": scenario_comment,
+    "login": scenario_login,
+    "create_project": scenario_create_project,
+}
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}, expected one of {sorted(SCENARIOS)}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+async def worker(ctx: Context, weights: dict[str, float], deadline: float, seed: int):
+    rng = random.Random(seed)
+    names, values = list(weights), list(weights.values())
+    while time.monotonic() < deadline:
+        name = rng.choices(names, values)[0]
+        try:
+            await SCENARIOS[name](ctx, rng)
+        except asyncio.TimeoutError:
+            ctx.recorder.statuses[name]["code_timeout"] += 1
+
+
+async def scrape_db_queries(client: httpx.AsyncClient) -> dict[str, tuple[float, float]]:
+    response = await client.get("/metrics")
+    totals = defaultdict(lambda: [0.0, 0.0])
+    for family in text_string_to_metric_families(response.text):
+        if family.name != "http_request_db_queries":
+            continue
+        for sample in family.samples:
+            if sample.name.endswith("_sum"):
+                totals[sample.labels["route"]][0] = sample.value
+            elif sample.name.endswith("_count"):
+                totals[sample.labels["route"]][1] = sample.value
+    return {route: tuple(values) for route, values in totals.items()}
+
+
+def db_queries_per_request(before: dict, after: dict) -> dict:
+    report = {}
+    for route, (queries, requests) in after.items():
+        queries -= before.get(route, (0.0, 0.0))[0]
+        requests -= before.get(route, (0.0, 0.0))[1]
+        if requests and route != "/metrics":
+            report[route] = {"requests": int(requests), "queries_per_request": round(queries / requests, 2)}
+    return report
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, ollama: FakeOllama, sink: SMTPSink) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        OLLAMA_URL=ollama.url,
+        SMTP_SERVER=sink.host,
+        SMTP_PORT=str(sink.port),
+        SMTP_STARTTLS="false",
+        SENDER_EMAIL="bench@example.com",
+        PASSWORD_EMAIL="",
+        DISPLAY_NAME="bench",
+    )
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+async def teardown(email_prefix: str):
+    from sqlalchemy import delete, or_, select
+    from app.database import AsyncSessionLocal, async_engine
+    from app.models import Project, ProjectComment, User, VerificationCode
+
+    async with AsyncSessionLocal() as db:
+        user_ids = select(User.id).where(User.email.startswith(email_prefix))
+        project_ids = select(Project.id).where(Project.creator_id.in_(user_ids))
+        await db.execute(delete(ProjectComment).where(or_(
+            ProjectComment.author_id.in_(user_ids), ProjectComment.project_id.in_(project_ids)
+        )))
+        await db.execute(delete(Project).where(Project.creator_id.in_(user_ids)))
+        await db.execute(delete(User).where(User.email.startswith(email_prefix)))
+        await db.execute(delete(VerificationCode).where(VerificationCode.email.startswith(email_prefix)))
+        await db.commit()
+    await async_engine.dispose()
+
+
+async def run(args):
+    ollama = FakeOllama(latency=args.ollama_latency, jitter=args.ollama_jitter,
+                        verdict=args.ollama_verdict, error_rate=args.ollama_error_rate)
+    sink = SMTPSink()
+    ollama.start()
+    await sink.start()
+
+    port = free_port()
+    server = start_server(port, ollama, sink)
+    run_id = uuid.uuid4().hex[:8]
+    email_prefix = f"bench-{run_id}-"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_until_ready(client, server)
+
+            setup_recorder = Recorder()
+            users = [BenchUser(email=f"{email_prefix}{i}@example.com") for i in range(args.users)]
+            ctx = Context(client=client, sink=sink, recorder=setup_recorder, users=users, project_ids=[])
+
+            setup_started = time.perf_counter()
+            slots = asyncio.Semaphore(args.concurrency)
+
+            async def limited(coro):
+                async with slots:
+                    return await coro
+
+            await asyncio.gather(*[limited(register(ctx, user)) for user in users])
+            created = await asyncio.gather(*[
+                limited(create_project(ctx, users[i % len(users)], i, setup_recorder)) for i in range(args.projects)
+            ])
+            owners = {project_id: users[i % len(users)] for i, project_id in enumerate(created) if project_id}
+            moderation = await wait_for_moderation(ctx, owners, args.moderation_timeout)
+            ctx.project_ids = list(owners)
+            setup_seconds = time.perf_counter() - setup_started
+            if not ctx.project_ids:
+                raise RuntimeError("no bench projects could be created")
+
+            ctx.recorder = Recorder()
+            queries_before = await scrape_db_queries(client)
+            ollama_before, emails_before = ollama.requests, sink.messages
+            started = time.perf_counter()
+            deadline = time.monotonic() + args.duration
+            await asyncio.gather(*[
+                worker(ctx, parse_mix(args.mix), deadline, args.seed + i) for i in range(args.concurrency)
+            ])
+            elapsed = time.perf_counter() - started
+            queries_after = await scrape_db_queries(client)
+    finally:
+        server.terminate()
+        server.wait()
+        ollama.stop()
+        await sink.stop()
+        if not args.keep_data:
+            await teardown(email_prefix)
+
+    recorder = ctx.recorder
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    all_statuses = sum(recorder.statuses.values(), Counter())
+    return {
+        "config": {
+            "users": args.users, "projects": args.projects, "duration": args.duration,
+            "concurrency": args.concurrency, "mix": parse_mix(args.mix), "seed": args.seed,
+            "ollama_latency": args.ollama_latency, "ollama_jitter": args.ollama_jitter,
+            "ollama_verdict": args.ollama_verdict, "ollama_error_rate": args.ollama_error_rate,
+        },
+        "setup": {
+            "seconds": round(setup_seconds, 2),
+            "moderation": moderation,
+            "endpoints": {
+                name: summarize(values, setup_recorder.statuses[name], setup_seconds)
+                for name, values in setup_recorder.latencies.items()
+            },
+        },
+        "seconds": round(elapsed, 2),
+        "total": summarize(all_latencies, all_statuses, elapsed),
+        "endpoints": {
+            name: summarize(values, recorder.statuses[name], elapsed)
+            for name, values in recorder.latencies.items()
+        },
+        "db_queries": db_queries_per_request(queries_before, queries_after),
+        "stubs": {
+            "ollama_requests": ollama.requests - ollama_before,
+            "ollama_errors": ollama.errors,
+            "emails": sink.messages - emails_before,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of mixed traffic")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="comma-separated scenario=weight pairs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--moderation-timeout", type=float, default=60.0)
+    parser.add_argument("--keep-data", action="store_true", help="leave bench users and projects in the DB")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    report = json.dumps(asyncio.run(run(args)), indent=2, sort_keys=True, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Project list serialization benchmark.
+
+Compares the old path (Project.from_orm per row, then FastAPI-style
+validation of ProjectListResponse and JSON encoding) with the column
+select + single orjson render used by GET /projects/:
+
+    python -m bench.serialization --rounds 200
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from pydantic import TypeAdapter
+from app.projects.service import summary_row
+from app.responses import FastJSONResponse
+from app.schemas import Project, ProjectListResponse
+
+
+def make_rows(count: int):
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(), title=f"Project {i}", description="Short description " * 5,
+            full_description="Full description " * 200, category="ecology", image=None,
+            current_amount=1000.0 + i, target_amount=50000.0, days_left=30, backers=i,
+            esg_e=4, esg_s=3, esg_g=5, created_at=now, end_date=now + timedelta(days=30),
+            creator_id=uuid.uuid4(), creator_name="Creator", creator_avatar=None
+        )
+        for i in range(count)
+    ]
+
+
+def old_path(rows, adapter):
+    projects = [Project.from_orm(row) for row in rows]
+    value = adapter.validate_python({"projects": projects})
+    return json.dumps(adapter.dump_python(value, mode="json")).encode()
+
+
+def new_path(rows, response):
+    return response.render({"projects": [summary_row(row) for row in rows], "next_cursor": None})
+
+
+def measure(function, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function()
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(ProjectListResponse)
+    response = FastJSONResponse(None)
+    results = []
+    for size in (100, 1000):
+        rows = make_rows(size)
+        old_ms = measure(lambda: old_path(rows, adapter), args.rounds)
+        new_ms = measure(lambda: new_path(rows, response), args.rounds)
+        results.append({
+            "rows": size,
+            "old_ms": round(old_ms, 3),
+            "new_ms": round(new_ms, 3),
+            "speedup": round(old_ms / new_ms, 2),
+            "old_bytes": len(old_path(rows, adapter)),
+            "new_bytes": len(new_path(rows, response)),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Startup-time benchmark.
+
+Runs each measurement in a fresh interpreter so module caches do not
+hide import cost:
+
+    python -m bench.startup --runs 5
+
+Reports how long ``import app.main`` takes, how long the lifespan
+startup takes and the latency of the first request to ``/``.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    ready = time.perf_counter()
+    client.get("/")
+    answered = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "lifespan_ms": (ready - imported) * 1000,
+    "first_request_ms": (answered - ready) * 1000,
+}))
+"""
+
+IMPORT_ONLY = """
+import json, time
+started = time.perf_counter()
+import app.main
+print(json.dumps({"import_ms": (time.perf_counter() - started) * 1000}))
+"""
+
+
+def run_probe(code: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-only", action="store_true", help="skip lifespan and request (no DB needed)")
+    args = parser.parse_args()
+
+    samples = [run_probe(IMPORT_ONLY if args.import_only else PROBE) for _ in range(args.runs)]
+    report = {
+        metric: {
+            "median": round(statistics.median(sample[metric] for sample in samples), 2),
+            "max": round(max(sample[metric] for sample in samples), 2),
+        }
+        for metric in samples[0]
+    }
+    report["runs"] = args.runs
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Local stand-ins for Ollama and SMTP.
+
+``FakeOllama`` answers ``POST /api/generate`` with one verdict per goal in
+the prompt after a configurable delay; ``SMTPSink`` accepts every message
+and remembers the verification codes it sees. Both can be run on their own
+for manual testing:
+
+    python -m bench.stubs --ollama-port 11434 --smtp-port 2525 --ollama-latency 0.5
+"""
+import argparse
+import asyncio
+import email
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GOAL_LINE = re.compile(r"^\s*(\d+)\.\s", re.MULTILINE)
+CODE = re.compile(r"\b(\d{6})\b")
+
+
+class FakeOllama:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.2,
+                 jitter: float = 0.0, verdict: str = "true", error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.verdict = verdict
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def answer(self, prompt: str) -> str:
+        goals = prompt.split("Вот цели:", 1)[-1]
+        ids = [int(match) for match in GOAL_LINE.findall(goals)] or [1]
+        return json.dumps([
+            {"id": goal_id, "valid": self.verdict, "reason": "bench", "e": "4", "s": "3", "g": "5"}
+            for goal_id in ids
+        ], ensure_ascii=False)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                time.sleep(max(0.0, random.gauss(stub.latency, stub.jitter)))
+
+                if random.random() < stub.error_rate:
+                    with stub._lock:
+                        stub.errors += 1
+                    self.send_response(500)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                text = stub.answer(payload.get("prompt", ""))
+                if payload.get("stream", True):
+                    chunks = [text[i:i + 16] for i in range(0, len(text), 16)]
+                    lines = [{"model": payload.get("model"), "response": chunk, "done": False} for chunk in chunks]
+                    lines.append({"model": payload.get("model"), "response": "", "done": True})
+                    body = b"".join(json.dumps(line, ensure_ascii=False).encode() + b"\n" for line in lines)
+                    content_type = "application/x-ndjson"
+                else:
+                    body = json.dumps(
+                        {"model": payload.get("model"), "response": text, "done": True}, ensure_ascii=False
+                    ).encode()
+                    content_type = "application/json"
+
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class SMTPSink:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages = 0
+        self._codes: dict[str, asyncio.Queue] = {}
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def wait_for_code(self, recipient: str, timeout: float = 10.0) -> str:
+        return await asyncio.wait_for(self._inbox(recipient).get(), timeout)
+
+    def clear(self, recipient: str):
+        self._codes.pop(recipient.lower(), None)
+
+    def _inbox(self, recipient: str) -> asyncio.Queue:
+        return self._codes.setdefault(recipient.lower(), asyncio.Queue())
+
+    def _deliver(self, recipients: list[str], data: bytes):
+        self.messages += 1
+        message = email.message_from_bytes(data)
+        for part in message.walk():
+            if part.get_content_type() != "text/plain":
+                continue
+            text = part.get_payload(decode=True).decode(part.get_content_charset() or "utf-8")
+            match = CODE.search(text)
+            if match:
+                for recipient in recipients:
+                    self._inbox(recipient).put_nowait(match.group(1))
+                return
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        recipients: list[str] = []
+        try:
+            await reply("220 bench sink ready")
+            while line := await reader.readline():
+                command, _, argument = line.decode(errors="replace").strip().partition(" ")
+                command = command.upper()
+                if command == "EHLO":
+                    await reply("250-bench\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME")
+                elif command == "AUTH":
+                    mechanism, _, initial = argument.partition(" ")
+                    steps = 2 if mechanism.upper() == "LOGIN" else (0 if initial else 1)
+                    for _ in range(steps):
+                        await reply("334 ")
+                        await reader.readline()
+                    await reply("235 accepted")
+                elif command == "MAIL":
+                    recipients = []
+                    await reply("250 ok")
+                elif command == "RCPT":
+                    recipients.append(argument.split(":", 1)[-1].strip().strip("<>"))
+                    await reply("250 ok")
+                elif command == "DATA":
+                    await reply("354 end with <CRLF>.<CRLF>")
+                    data = bytearray()
+                    while (chunk := await reader.readline()) not in (b".\r\n", b""):
+                        data += chunk[1:] if chunk.startswith(b"..") else chunk
+                    self._deliver(recipients, bytes(data))
+                    await reply("250 queued")
+                elif command in ("HELO", "RSET", "NOOP"):
+                    await reply("250 ok")
+                elif command == "QUIT":
+                    await reply("221 bye")
+                    break
+                else:
+                    await reply("502 not implemented")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args):
+    ollama = FakeOllama(port=args.ollama_port, latency=args.ollama_latency, jitter=args.ollama_jitter,
+                        verdict=args.ollama_verdict, error_rate=args.ollama_error_rate)
+    sink = SMTPSink(port=args.smtp_port)
+    ollama.start()
+    await sink.start()
+    print(json.dumps({"ollama_url": ollama.url, "smtp_port": sink.port}))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        ollama.stop()
+        await sink.stop()
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--ollama-latency", type=float, default=0.2, help="mean seconds per Ollama call")
+    parser.add_argument("--ollama-jitter", type=float, default=0.0, help="stddev of the Ollama delay")
+    parser.add_argument("--ollama-verdict", choices=["true", "false", "doubt"], default="true")
+    parser.add_argument("--ollama-error-rate", type=float, default=0.0, help="share of calls answered with 500")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ollama-port", type=int, default=11434)
+    parser.add_argument("--smtp-port", type=int, default=2525)
+    add_stub_arguments(parser)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-from app.main import app
 import uvicorn
 
 if __name__ == "__main__":
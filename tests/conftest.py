@@ -0,0 +1,11 @@
+import os
+
+# app.database builds its engines on import; nothing connects until a query runs.
+for key, value in {
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "DB_USER": "test",
+    "DB_PASS": "test",
+}.items():
+    os.environ.setdefault(key, value)
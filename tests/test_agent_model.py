@@ -0,0 +1,42 @@
+from app.agent_model import JSONScanner
+
+
+def feed_all(chunks):
+    scanner = JSONScanner()
+    results = [scanner.feed(chunk) for chunk in chunks]
+    return results[:-1], results[-1]
+
+
+def test_waits_for_the_closing_bracket():
+    pending, result = feed_all(['[{"goal": "trees"', ', "score": 3}', "]"])
+
+    assert pending == [None, None]
+    assert result == [{"goal": "trees", "score": 3}]
+
+
+def test_ignores_brackets_and_quotes_inside_strings():
+    pending, result = feed_all(['[{"goal": "plant ]} \\"', 'trees\\" [now]"}', "]"])
+
+    assert pending == [None, None]
+    assert result == [{"goal": 'plant ]} "trees" [now]'}]
+
+
+def test_escape_split_across_chunks():
+    pending, result = feed_all(['{"goal": "a\\', '"]"}'])
+
+    assert pending == [None]
+    assert result == {"goal": 'a"]'}
+
+
+def test_skips_text_before_the_json():
+    pending, result = feed_all(["Вот ответ: ", "[1, ", "2] и ещё [3]"])
+
+    assert pending == [None, None]
+    assert result == [1, 2]
+
+
+def test_restarts_after_invalid_candidate():
+    scanner = JSONScanner()
+
+    assert scanner.feed("[see below] ") is None
+    assert scanner.feed('{"ok": true}') == {"ok": True}
@@ -0,0 +1,66 @@
+import re
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.models import Project as ProjectModel
+from app.projects.service import (
+    SORT_ORDERS, decode_cursor, encode_cursor, feed_query, keyset_after, keyset_order, search_query
+)
+
+
+def compile_asyncpg(query) -> str:
+    return str(query.compile(dialect=asyncpg.dialect()))
+
+
+@pytest.mark.parametrize("sort", sorted(SORT_ORDERS))
+def test_second_page_binds_id_as_uuid(sort):
+    column, descending = SORT_ORDERS[sort]
+    value = 125.5 if sort == "most_funded" else datetime(2025, 5, 1, 12, 30)
+    cursor = encode_cursor(sort, value, str(uuid.uuid4()))
+
+    last_value, last_id = decode_cursor(cursor, sort)
+    query = (
+        select(ProjectModel.id)
+        .where(keyset_after(column, ProjectModel.id, descending, last_value, last_id))
+        .order_by(*keyset_order(column, ProjectModel.id, descending))
+    )
+    sql = compile_asyncpg(query)
+
+    assert isinstance(last_id, uuid.UUID)
+    assert last_value == value
+    assert "VARCHAR" not in sql
+    assert "::UUID" in sql
+
+
+@pytest.mark.parametrize("cursor", [
+    encode_cursor("newest", {"dt": "2025-05-01T12:30:00"}, "not-a-uuid"),
+    encode_cursor("newest", "2025-05-01"),
+    encode_cursor("ending_soon", {"dt": "2025-05-01T12:30:00"}, str(uuid.uuid4())),
+    "%%%",
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "newest")
+    assert error.value.status_code == 400
+
+
+def test_feed_second_page_binds_ids_as_uuid():
+    cursor = encode_cursor("feed", datetime(2025, 5, 1, 12, 30, tzinfo=timezone.utc), str(uuid.uuid4()))
+    sql = compile_asyncpg(feed_query(uuid.uuid4(), decode_cursor(cursor, "feed"), 20))
+
+    bounds = re.findall(r"\) < \(\$\d+::([A-Z ]+), \$\d+::([A-Z]+)\)", sql)
+
+    assert bounds == [("TIMESTAMP WITH TIME ZONE", "UUID")] * 2
+
+
+def test_search_second_page_binds_rank_and_id():
+    cursor = encode_cursor("search", 0.1, str(uuid.uuid4()))
+    sql = compile_asyncpg(search_query("лес", None, True, decode_cursor(cursor, "search"), 20))
+    bounds = re.findall(r"\) < \(\$\d+::([A-Z ]+), \$\d+::([A-Z]+)\)", sql)
+
+    assert bounds == [("FLOAT", "UUID")]
@@ -0,0 +1,54 @@
+from app.leaderboards.service import Ranking
+
+
+def ranking(**scores) -> Ranking:
+    board = Ranking()
+    for key, score in scores.items():
+        board.update(key, score)
+    return board
+
+
+def test_orders_by_score_then_key():
+    board = ranking(b=5.0, a=5.0, c=9.0)
+
+    assert board.top(10) == [("c", 9.0), ("a", 5.0), ("b", 5.0)]
+    assert board.top(1) == [("c", 9.0)]
+
+
+def test_rescoring_moves_the_existing_entry():
+    board = ranking(a=1.0, b=2.0, c=3.0)
+
+    board.update("a", 10.0)
+    board.update("c", 0.5)
+
+    assert len(board) == 3
+    assert board.top(10) == [("a", 10.0), ("b", 2.0), ("c", 0.5)]
+
+
+def test_rescoring_with_the_same_score_keeps_one_entry():
+    board = ranking(a=1.0)
+
+    board.update("a", 1.0)
+    board.add("a", 0.0)
+
+    assert board.top(10) == [("a", 1.0)]
+
+
+def test_add_accumulates():
+    board = Ranking()
+
+    board.add("a", 2.5)
+    board.add("b", 3.0)
+    board.add("a", 1.0)
+
+    assert board.top(10) == [("a", 3.5), ("b", 3.0)]
+
+
+def test_remove():
+    board = ranking(a=1.0, b=2.0)
+
+    board.remove("b")
+    board.remove("missing")
+
+    assert len(board) == 1
+    assert board.top(10) == [("a", 1.0)]
@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import DateTime, insert
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.models import Project as ProjectModel
+from app.projects.service import naive_utc, new_project
+from app.schemas import ProjectCreate
+
+PG_EPOCH = datetime(2000, 1, 1)
+
+
+def bind_asyncpg(statement) -> dict:
+    """Binds a statement the way asyncpg encodes it.
+
+    asyncpg encodes a TIMESTAMP WITHOUT TIME ZONE parameter as
+    ``value - datetime(2000, 1, 1)``, which raises TypeError for aware values.
+    """
+    compiled = statement.compile(dialect=asyncpg.dialect())
+    params = compiled.construct_params()
+    for name, value in params.items():
+        column_type = compiled.binds[name].type
+        if isinstance(column_type, DateTime) and not column_type.timezone and value is not None:
+            value - PG_EPOCH
+    return params
+
+
+def project_insert(project: ProjectModel):
+    values = {
+        column.key: getattr(project, column.key)
+        for column in ProjectModel.__table__.columns
+        if getattr(project, column.key) is not None
+    }
+    return insert(ProjectModel).values(values)
+
+
+def test_new_project_binds_naive_utc_timestamps():
+    end_date = datetime.now(timezone(timedelta(hours=3))) + timedelta(days=10)
+    data = ProjectCreate(
+        title="Посадка леса", description="Высадим тысячу деревьев в парке",
+        category="ecology", target_amount=1000, end_date=end_date
+    )
+    user = SimpleNamespace(id=uuid.uuid4(), name="Автор", avatar=None)
+
+    project = new_project(data, user)
+    params = bind_asyncpg(project_insert(project))
+
+    assert params["end_date"] == end_date.astimezone(timezone.utc).replace(tzinfo=None)
+    assert params["created_at"].tzinfo is None
+    assert project.days_left == 9
+
+
+def test_naive_utc_keeps_naive_values():
+    value = datetime(2025, 5, 1, 12, 30)
+    assert naive_utc(value) is value
+    assert naive_utc(value.replace(tzinfo=timezone.utc)) == value